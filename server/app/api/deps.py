@@ -5,7 +5,12 @@ Re-exports commonly used dependencies for cleaner imports in routes.
 """
 
 from app.core.config import Settings, get_settings
-from app.core.security import TokenClaims, verify_token
+from app.core.security import (
+    JWTVerifier,
+    TokenClaims,
+    get_jwt_verifier,
+    verify_token,
+)
 from app.providers.apple import AppleProvider, get_apple_provider
 from app.providers.cognito import CognitoProvider, get_cognito_provider
 from app.providers.google import GoogleProvider, get_google_provider
@@ -19,6 +24,8 @@ __all__ = [
     "Settings",
     "get_settings",
     # Security
+    "JWTVerifier",
+    "get_jwt_verifier",
     "TokenClaims",
     "verify_token",
     # Services
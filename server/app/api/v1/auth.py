@@ -12,8 +12,23 @@ from urllib.parse import urlencode
 from fastapi import APIRouter, Depends, Form
 from fastapi.responses import HTMLResponse
 
-from app.api.deps import AuthService, get_auth_service
-from app.schemas.auth import AppleAuthRequest, AuthTokenResponse, GoogleAuthRequest
+from app.api.deps import (
+    AuthService,
+    JWTVerifier,
+    get_auth_service,
+    get_jwt_verifier,
+    verify_token,
+)
+from app.core.security import InvalidTokenError
+from app.schemas.auth import (
+    AppleAuthRequest,
+    AuthTokenResponse,
+    GoogleAuthRequest,
+    RefreshTokenRequest,
+    TokenIntrospectionRequest,
+    TokenIntrospectionResponse,
+    TokenIntrospectionResult,
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -55,6 +70,50 @@ async def google_sign_in(
     return await auth_service.exchange_google_token(request)
 
 
+@router.post("/refresh", response_model=AuthTokenResponse)
+async def refresh_tokens(
+    request: RefreshTokenRequest,
+    auth_service: Annotated[AuthService, Depends(get_auth_service)],
+) -> AuthTokenResponse:
+    """
+    Exchange a Cognito refresh token for new ID/access tokens.
+
+    Use this when the ID/access tokens expire instead of repeating the
+    Apple/Google exchange. The same refresh token is returned and stays
+    valid until its own expiry.
+    """
+    return await auth_service.refresh_tokens(request)
+
+
+@router.post(
+    "/introspect",
+    response_model=TokenIntrospectionResponse,
+    dependencies=[Depends(verify_token)],
+)
+async def introspect_tokens(
+    request: TokenIntrospectionRequest,
+    jwt_verifier: Annotated[JWTVerifier, Depends(get_jwt_verifier)],
+) -> TokenIntrospectionResponse:
+    """
+    Validate a batch of Cognito/Google tokens in one call (protected endpoint).
+
+    Returns, in request order, the verified claims for each active token or
+    an error code (e.g. ``expired``, ``unknown_key``, ``invalid_signature``).
+    """
+    results = []
+    for outcome in await jwt_verifier.verify_many(request.tokens):
+        if isinstance(outcome, dict):
+            results.append(TokenIntrospectionResult(active=True, claims=outcome))
+        else:
+            error = (
+                outcome.reason
+                if isinstance(outcome, InvalidTokenError)
+                else "verification_unavailable"
+            )
+            results.append(TokenIntrospectionResult(active=False, error=error))
+    return TokenIntrospectionResponse(results=results)
+
+
 @router.post("/apple/callback", response_class=HTMLResponse)
 async def apple_callback(
     code: str = Form(None),
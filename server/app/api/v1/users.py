@@ -4,15 +4,19 @@ User endpoints.
 Thin controller layer - delegates business logic to services.
 """
 
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
 
 from app.api.deps import TokenClaims, UserService, get_user_service
 from app.schemas.users import UserResponse
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user(
@@ -31,9 +35,35 @@ async def get_current_user(
 async def list_users(
     claims: TokenClaims,
     user_service: Annotated[UserService, Depends(get_user_service)],
-) -> list[UserResponse]:
-    """List all users (protected endpoint)."""
-    return await user_service.list_users()
+    response: Response,
+    limit: Annotated[int | None, Query(ge=1, le=MAX_PAGE_SIZE)] = None,
+    after: Annotated[str | None, Query(min_length=1)] = None,
+    response_format: Annotated[
+        Literal["json", "ndjson"], Query(alias="format")
+    ] = "json",
+) -> list[UserResponse] | StreamingResponse:
+    """
+    List users (protected endpoint).
+
+    - ``limit``/``after``: one page ordered by user ID; pass the
+      ``X-Next-Cursor`` response header as ``after`` for the next page
+      (absent on the last page).
+    - ``format=ndjson``: stream every user as newline-delimited JSON.
+    - Neither: every user in one array.
+    """
+    if response_format == "ndjson":
+        return StreamingResponse(
+            user_service.export_users(), media_type="application/x-ndjson"
+        )
+    if limit is None and after is None:
+        return await user_service.list_users()
+
+    users, next_cursor = await user_service.list_users_page(
+        limit or DEFAULT_PAGE_SIZE, after
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return users
 
 
 @router.get("/{user_id}", response_model=UserResponse)
@@ -0,0 +1,122 @@
+"""
+Group commit for concurrent writes.
+
+Lets many concurrent writers share one durable write: submissions queue
+up for a single writer task, which commits them in batches.
+"""
+
+import asyncio
+import contextlib
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+
+class GroupCommitClosedError(Exception):
+    """The committer was closed before the item's batch was committed."""
+
+    def __init__(self) -> None:
+        super().__init__("Group committer closed before the item was committed")
+
+
+class GroupCommitter:
+    """
+    Single-writer queue that commits concurrent submissions in batches.
+
+    The writer takes everything queued (up to ``max_batch_size``) and
+    passes it to ``commit``, which returns one result per item. Items
+    submitted while a commit runs form the next batch; with ``max_delay``
+    the writer also waits that long for a batch to fill. Each caller of
+    ``submit`` awaits its own result; if ``commit`` raises, every caller in
+    that batch gets the exception. A caller cancelled while waiting doesn't
+    withdraw its item. After ``close``, every caller still waiting (queued
+    or in the batch being committed) gets ``GroupCommitClosedError``.
+    """
+
+    def __init__(
+        self,
+        commit: Callable[[list[Any]], Awaitable[list[Any]]],
+        max_batch_size: int = 100,
+        max_delay: float = 0.0,
+    ):
+        self.commit = commit
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_delay = max_delay
+
+        self._queue: asyncio.Queue[tuple[Any, asyncio.Future[Any]]] = asyncio.Queue()
+        self._batch_full = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._batch: list[tuple[Any, asyncio.Future[Any]]] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: Any) -> Any:
+        """Queue ``item`` and wait until its batch is committed."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # First use, or reused from a new event loop (e.g. in tests)
+            self._queue = asyncio.Queue()
+            self._batch_full = asyncio.Event()
+            self._task = None
+            self._batch = []
+            self._loop = loop
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+        future = loop.create_future()
+        self._queue.put_nowait((item, future))
+        if self._queue.qsize() + 1 >= self.max_batch_size:
+            self._batch_full.set()
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            # Tracked from here so close() can fail it if the writer stops
+            self._batch = batch
+            if self.max_delay > 0 and self._queue.qsize() + 1 < self.max_batch_size:
+                self._batch_full.clear()
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._batch_full.wait(), self.max_delay)
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            self.batches += 1
+            self.items += len(batch)
+            try:
+                results = await self.commit([item for item, _ in batch])
+                # strict: a commit returning the wrong count fails the batch
+                for (_, future), result in zip(batch, results, strict=True):
+                    if not future.done():
+                        future.set_result(result)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                self._batch = []
+
+    async def close(self) -> None:
+        """Stop the writer and fail every caller still waiting on it."""
+        pending = list(self._batch)
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(GroupCommitClosedError())
+
+    def stats(self) -> dict[str, Any]:
+        """Batch counters for monitoring."""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": (
+                round(self.items / self.batches, 2) if self.batches else 0
+            ),
+            "queued": self._queue.qsize(),
+        }
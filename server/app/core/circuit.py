@@ -0,0 +1,151 @@
+"""
+Circuit breakers for calls to external dependencies.
+
+A breaker watches recent call outcomes for one dependency. Once too many
+of them fail or are too slow it opens and callers fail fast, instead of
+each request waiting out the full network timeout of a degraded service.
+"""
+
+import time
+from collections import deque
+from typing import Any
+
+from app.core.config import Settings
+
+
+class CircuitOpenError(Exception):
+    """The breaker is open; the call was not attempted."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit {name} is open (retry in {retry_after:.1f}s)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker over a sliding window of calls.
+
+    - closed: calls pass; the last ``window_size`` outcomes are kept. Once
+      at least ``min_calls`` are recorded and the share of failed or slow
+      (``>= slow_call_seconds``) calls reaches ``failure_rate``, it opens.
+    - open: ``allow`` raises ``CircuitOpenError`` for ``open_seconds``.
+    - half-open: up to ``half_open_calls`` trial calls pass. If all succeed
+      the breaker closes; any failure opens it again.
+
+    Not thread-safe; use from one event loop.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        window_size: int = 20,
+        min_calls: int = 10,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 2.0,
+        open_seconds: float = 30.0,
+        half_open_calls: int = 3,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+
+        self._outcomes: deque[bool] = deque(maxlen=window_size)  # True = failed
+        self._state = self.CLOSED
+        self._changed_at = time.monotonic()
+        self._trials = 0
+        self._trial_successes = 0
+        self.times_opened = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_settings(cls, name: str, settings: Settings) -> "CircuitBreaker":
+        return cls(
+            name,
+            window_size=settings.breaker_window_size,
+            min_calls=settings.breaker_min_calls,
+            failure_rate=settings.breaker_failure_rate,
+            slow_call_seconds=settings.breaker_slow_call_seconds,
+            open_seconds=settings.breaker_open_seconds,
+            half_open_calls=settings.breaker_half_open_calls,
+        )
+
+    @property
+    def state(self) -> str:
+        """Current state, moving open -> half-open once the open period ends."""
+        elapsed = time.monotonic() - self._changed_at
+        if self._state == self.OPEN and elapsed >= self.open_seconds:
+            self._transition(self.HALF_OPEN)
+        elif self._state == self.HALF_OPEN and elapsed >= self.open_seconds:
+            # Trial calls that never reported back (cancelled) free their slots
+            self._transition(self.HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: str) -> None:
+        self._state = state
+        self._changed_at = time.monotonic()
+        self._trials = 0
+        self._trial_successes = 0
+        if state == self.OPEN:
+            self.times_opened += 1
+        if state == self.CLOSED:
+            self._outcomes.clear()
+
+    def allow(self) -> None:
+        """Admit a call or raise ``CircuitOpenError``."""
+        state = self.state
+        if state == self.CLOSED:
+            return
+        if state == self.HALF_OPEN and self._trials < self.half_open_calls:
+            self._trials += 1
+            return
+
+        self.rejected += 1
+        retry_after = max(
+            0.0, self.open_seconds - (time.monotonic() - self._changed_at)
+        )
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record(self, duration: float, failed: bool = False) -> None:
+        """Record the outcome of an admitted call."""
+        failed = failed or duration >= self.slow_call_seconds
+
+        if self._state == self.HALF_OPEN:
+            if failed:
+                self._transition(self.OPEN)
+            else:
+                self._trial_successes += 1
+                if self._trial_successes >= self.half_open_calls:
+                    self._transition(self.CLOSED)
+            return
+
+        self._outcomes.append(failed)
+        if (
+            self._state == self.CLOSED
+            and len(self._outcomes) >= self.min_calls
+            and self._failure_ratio() >= self.failure_rate
+        ):
+            self._transition(self.OPEN)
+
+    def _failure_ratio(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(self._outcomes) / len(self._outcomes)
+
+    def stats(self) -> dict[str, Any]:
+        """State and counters for monitoring."""
+        return {
+            "state": self.state,
+            "failure_rate": round(self._failure_ratio(), 3),
+            "window_calls": len(self._outcomes),
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
@@ -6,6 +6,7 @@ Loads configuration from environment variables and .env file.
 
 from functools import lru_cache
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import BaseSettings
 
@@ -21,6 +22,31 @@ class Settings(BaseSettings):
     aws_region: str = "us-east-1"
     cognito_user_pool_id: str = ""
     cognito_client_id: str = ""
+    # Threads running blocking boto3 Cognito calls (bounds concurrent calls)
+    cognito_max_workers: int = 16
+    # Connection pool size of the shared boto3 Cognito client
+    cognito_max_pool_connections: int = 16
+    # Override the Cognito endpoint (e.g. a local stand-in); empty = AWS
+    cognito_endpoint_url: str = ""
+    # Cache of usernames known to exist in Cognito (0 disables caching)
+    cognito_known_user_cache_max_entries: int = 10_000
+    # How long a confirmed username is trusted without asking Cognito (seconds)
+    cognito_known_user_ttl: float = 3600.0
+    # Client-side Cognito quotas per API operation (requests/second, 0 = unlimited).
+    # Defaults are the AWS account quotas; divide by the number of processes.
+    cognito_quotas: dict[str, float] = {
+        "admin_get_user": 120.0,
+        "admin_create_user": 50.0,
+        "admin_set_user_password": 25.0,
+        "admin_initiate_auth": 120.0,
+        "describe_user_pool": 15.0,
+    }
+    # Longest a Cognito call may queue for its quota before failing with 503 (seconds)
+    cognito_quota_max_wait: float = 2.0
+    # Retries for calls Cognito throttles anyway, with decorrelated jitter (seconds)
+    cognito_throttle_retries: int = 3
+    cognito_retry_base_delay: float = 0.05
+    cognito_retry_max_delay: float = 1.0
 
     # Apple Sign In (comma-separated: iOS bundle ID + Services ID for web/Android)
     apple_bundle_id: str = ""
@@ -42,6 +68,45 @@ class Settings(BaseSettings):
             return []
         return [cid.strip() for cid in self.google_client_id.split(",") if cid.strip()]
 
+    # JWKS background refresh interval (seconds)
+    jwks_refresh_interval: float = 900.0
+    # Minimum gap between refetches forced by unknown key IDs (seconds)
+    jwks_min_refresh_interval: float = 30.0
+    # How long a key ID missing after a refetch is remembered as unknown (seconds)
+    jwks_unknown_kid_ttl: float = 300.0
+    # Persisted JWKS snapshots older than this are not served (seconds)
+    jwks_snapshot_max_age: float = 7 * 24 * 3600.0
+
+    # Circuit breakers around Cognito and each JWKS endpoint: open once
+    # failure_rate of the last window_size calls (at least min_calls) failed or
+    # took >= slow_call_seconds; stay open for open_seconds, then allow
+    # half_open_calls trial calls
+    breaker_window_size: int = 20
+    breaker_min_calls: int = 10
+    breaker_failure_rate: float = 0.5
+    breaker_slow_call_seconds: float = 2.0
+    breaker_open_seconds: float = 30.0
+    breaker_half_open_calls: int = 3
+
+    # Per-request time budget for outbound calls (seconds, 0 = no deadline),
+    # with per-path-prefix overrides
+    request_budget_seconds: float = 10.0
+    route_budgets: dict[str, float] = {
+        "/auth/apple": 8.0,
+        "/auth/google": 8.0,
+        "/auth/refresh": 5.0,
+    }
+
+    # Verified-claims cache (0 disables caching)
+    token_cache_max_entries: int = 10_000
+    # Bearer tokens longer than this are rejected before parsing
+    token_max_length: int = 8192
+
+    # Where RS256 signature checks run: inline (event loop), thread or process pool
+    jwt_verify_backend: Literal["inline", "thread", "process"] = "inline"
+    # Pool size for the thread/process backends (0 = CPU count)
+    jwt_verify_workers: int = 0
+
     # CORS
     cors_origins: list[str] = [
         "http://localhost:3000",
@@ -54,16 +119,40 @@ class Settings(BaseSettings):
 
     # Data storage
     data_dir: Path = Path(__file__).parent.parent.parent / "data"
+    # User store: "json" (data_dir/users.json) or "sqlite" (data_dir/users.db)
+    user_store: Literal["json", "sqlite"] = "json"
+    # JSON store: fold the append log into users.json every interval (seconds)
+    # once it holds at least min_records records
+    user_log_compact_interval: float = 300.0
+    user_log_compact_min_records: int = 1000
+    # JSON store: concurrent creates are committed together, up to batch_size
+    # per write; batch_delay > 0 waits that long for a batch to fill (0 = take
+    # whatever queued up during the previous write)
+    user_write_batch_size: int = 100
+    user_write_batch_delay: float = 0.0
 
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
         extra = "ignore"  # Ignore extra env vars not in the model
 
+    @property
+    def max_request_budget(self) -> float | None:
+        """Largest per-request budget across routes (None if any is unbounded)."""
+        budgets = [self.request_budget_seconds, *self.route_budgets.values()]
+        if any(budget <= 0 for budget in budgets):
+            return None
+        return max(budgets)
+
     @property
     def is_production(self) -> bool:
         return self.environment == "production"
 
+    @property
+    def sqlite_path(self) -> Path:
+        """SQLite user database path."""
+        return self.data_dir / "users.db"
+
     @property
     def cognito_jwks_url(self) -> str:
         """Get the Cognito JWKS URL."""
@@ -0,0 +1,32 @@
+"""
+Request deadline helpers for outbound calls.
+
+``DeadlineMiddleware`` stores each request's deadline in ``deadline_var``;
+these helpers turn it into the timeout an outbound call may still use.
+"""
+
+import time
+
+from app.core.exceptions import DeadlineExceededError
+from app.core.middleware import deadline_var
+
+
+def remaining() -> float | None:
+    """Seconds left in the current request's budget (None if unbounded)."""
+    deadline = deadline_var.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def timeout_for(service: str, default: float | None = None) -> float | None:
+    """
+    Timeout for a call to ``service``: the remaining budget, capped at
+    ``default``. Raises ``DeadlineExceededError`` if the budget is spent.
+    """
+    budget = remaining()
+    if budget is None:
+        return default
+    if budget <= 0:
+        raise DeadlineExceededError(service)
+    return budget if default is None else min(budget, default)
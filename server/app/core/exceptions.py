@@ -73,6 +73,16 @@ class ExternalServiceError(AppException):
         )
 
 
+class DeadlineExceededError(AppException):
+    """The request's time budget ran out while waiting on a dependency."""
+
+    def __init__(self, service: str = "External service"):
+        super().__init__(
+            f"Request deadline exceeded waiting for {service}",
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        )
+
+
 def _build_error_response(
     status_code: int,
     message: str,
@@ -1,7 +1,7 @@
 """
 HTTP middleware for request processing.
 
-Provides request ID tracking, logging, and security headers.
+Provides request ID tracking, request deadlines, logging, and security headers.
 """
 
 import logging
@@ -9,13 +9,17 @@ import time
 import uuid
 from contextvars import ContextVar
 
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.requests import Request
 from starlette.responses import Response
+from starlette.types import ASGIApp
 
 # Context variable for request ID - accessible across async contexts
 request_id_var: ContextVar[str] = ContextVar("request_id", default="")
 
+# Request deadline as a time.monotonic() value (None = no deadline)
+deadline_var: ContextVar[float | None] = ContextVar("deadline", default=None)
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,6 +35,53 @@ class RequestIDMiddleware(BaseHTTPMiddleware):
         return response
 
 
+class DeadlineMiddleware(BaseHTTPMiddleware):
+    """
+    Give each request a time budget, carried in ``deadline_var``.
+
+    Outbound calls (Cognito, JWKS) use whatever budget remains as their
+    timeout, so a request stops waiting once the client has given up.
+    Budgets are set per path prefix (``/auth/apple`` also covers
+    ``/auth/apple/`` and ``/auth/apple/callback``; the longest prefix wins),
+    falling back to ``default_budget``; a budget of 0 means no deadline.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        default_budget: float,
+        route_budgets: dict[str, float] | None = None,
+    ):
+        super().__init__(app)
+        self.default_budget = default_budget
+        # Longest first, so the most specific prefix is matched
+        self.route_budgets = sorted(
+            (
+                (path.rstrip("/"), budget)
+                for path, budget in (route_budgets or {}).items()
+            ),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+
+    def budget_for(self, path: str) -> float:
+        """The budget of the longest configured prefix of ``path``."""
+        for prefix, budget in self.route_budgets:
+            if path == prefix or path.startswith(prefix + "/"):
+                return budget
+        return self.default_budget
+
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        budget = self.budget_for(request.url.path)
+        token = deadline_var.set(time.monotonic() + budget if budget > 0 else None)
+        try:
+            return await call_next(request)
+        finally:
+            deadline_var.reset(token)
+
+
 class LoggingMiddleware(BaseHTTPMiddleware):
     """Log all requests with timing information."""
 
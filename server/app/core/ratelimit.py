@@ -0,0 +1,150 @@
+"""
+Client-side rate limiting for quota-limited external APIs.
+
+Provides token buckets and a scheduler that queues calls per operation so
+bursts are smoothed to the configured quotas instead of being throttled by
+the provider.
+"""
+
+import asyncio
+import random
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+
+class QuotaExceededError(Exception):
+    """A call could not be scheduled within the maximum queueing wait."""
+
+    def __init__(self, operation: str, wait: float):
+        super().__init__(f"{operation} quota exhausted (next slot in {wait:.2f}s)")
+        self.operation = operation
+        self.wait = wait
+
+
+def decorrelated_jitter(previous: float, base: float, cap: float) -> float:
+    """
+    Next backoff delay using "decorrelated jitter".
+
+    Each delay is drawn between ``base`` and three times the previous delay,
+    capped at ``cap``, which spreads retries from many callers apart.
+    """
+    return min(cap, random.uniform(base, previous * 3))
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out reservations instead of rejections.
+
+    ``reserve`` always takes a token and returns how long the caller must
+    wait before using it. The balance may go negative, which queues callers
+    in arrival order. Not thread-safe; use from one event loop.
+    """
+
+    def __init__(self, rate: float, burst: float | None = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Seconds until a token reserved now could be used."""
+        self._refill()
+        return max(0.0, (1.0 - self.tokens) / self.rate)
+
+    def reserve(self) -> float:
+        """Take a token; return the seconds to wait before using it."""
+        wait = self.delay()
+        self.tokens -= 1.0
+        return wait
+
+
+@dataclass
+class OperationStats:
+    """Queueing counters for one operation."""
+
+    waiting: int = 0
+    waited: int = 0
+    wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    rejected: int = 0
+    throttled: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "queue_depth": self.waiting,
+            "waited": self.waited,
+            "avg_wait_ms": (
+                round(self.wait_seconds / self.waited * 1000, 1) if self.waited else 0.0
+            ),
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 1),
+            "rejected": self.rejected,
+            "throttled": self.throttled,
+        }
+
+
+class QuotaScheduler:
+    """
+    Per-operation token buckets with a bounded queueing wait.
+
+    ``acquire`` returns once the operation may run, sleeping for its turn
+    if the bucket is empty. A call that would have to wait longer than
+    ``max_wait`` raises ``QuotaExceededError`` instead of queueing.
+    Operations without a configured rate are not limited.
+    """
+
+    def __init__(self, rates: Mapping[str, float], max_wait: float):
+        self.max_wait = max_wait
+        self.buckets = {op: TokenBucket(rate) for op, rate in rates.items() if rate > 0}
+        self.operations: dict[str, OperationStats] = {
+            op: OperationStats() for op in self.buckets
+        }
+
+    def _stats(self, operation: str) -> OperationStats:
+        return self.operations.setdefault(operation, OperationStats())
+
+    async def acquire(self, operation: str, max_wait: float | None = None) -> None:
+        """
+        Wait for the operation's turn under its quota.
+
+        ``max_wait`` can lower the scheduler's maximum wait for this call
+        (e.g. to a request's remaining deadline).
+        """
+        bucket = self.buckets.get(operation)
+        if bucket is None:
+            return
+
+        if max_wait is None or max_wait > self.max_wait:
+            max_wait = self.max_wait
+        stats = self._stats(operation)
+        delay = bucket.delay()
+        if delay > max_wait:
+            stats.rejected += 1
+            raise QuotaExceededError(operation, delay)
+
+        wait = bucket.reserve()
+        if wait <= 0:
+            return
+
+        stats.waiting += 1
+        stats.waited += 1
+        stats.wait_seconds += wait
+        stats.max_wait_seconds = max(stats.max_wait_seconds, wait)
+        try:
+            await asyncio.sleep(wait)
+        finally:
+            stats.waiting -= 1
+
+    def record_throttle(self, operation: str) -> None:
+        """Count a call the provider throttled despite the client-side quota."""
+        self._stats(operation).throttled += 1
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Queue depth and wait-time counters per operation."""
+        return {op: stats.as_dict() for op, stats in self.operations.items()}
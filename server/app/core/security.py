@@ -4,14 +4,26 @@ Security utilities for JWT verification.
 Handles token verification against Cognito and Google JWKS.
 """
 
+import asyncio
+import hashlib
 import logging
-from typing import Annotated
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import Annotated, Any, NoReturn
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jose import JWTError, jwt, jwk
+from jose import JWTError
+from jose.backends.base import Key
+from jose.exceptions import ExpiredSignatureError, JWTClaimsError
 
+from app.core.cache import TTLCache
 from app.core.config import Settings, get_settings
+from app.core.exceptions import AppException
+from app.core.signature import SignatureVerifier, get_signature_verifier
+from app.core.tokens import ParsedToken
 from app.services.jwks_service import JWKSService, get_jwks_service
 
 logger = logging.getLogger(__name__)
@@ -20,133 +32,320 @@ logger = logging.getLogger(__name__)
 bearer_scheme = HTTPBearer()
 
 
-class JWTVerifier:
+@lru_cache
+def get_claims_cache() -> TTLCache:
     """
-    JWT verification service.
+    Process-wide cache of verified token claims (singleton).
 
-    Verifies tokens from multiple issuers (Cognito, Google) using their respective JWKS.
+    Keyed by a SHA-256 digest of the raw token; entries expire at the
+    token's own ``exp`` so a cached token is never accepted past expiry.
     """
+    return TTLCache(max_entries=get_settings().token_cache_max_entries)
 
-    def __init__(self, settings: Settings, jwks_service: JWKSService):
-        self.settings = settings
-        self.jwks_service = jwks_service
 
-    def _find_key(self, jwks: dict, kid: str):
-        """Find a matching key in a JWKS by key ID."""
-        for key in jwks.get("keys", []):
-            if key.get("kid") == kid:
-                return jwk.construct(key)
-        return None
+class InvalidTokenError(HTTPException):
+    """401 for a rejected bearer token, tagged with a machine-readable reason."""
 
-    def _verify_cognito_token(self, token: str, kid: str) -> dict:
-        """Verify a Cognito JWT token."""
-        jwks = self.jwks_service.get_cognito_jwks()
-        key = self._find_key(jwks, kid)
+    def __init__(self, reason: str, detail: str = "Invalid or expired token"):
+        super().__init__(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
+        self.reason = reason
 
-        if not key:
-            # Clear cache and retry (key rotation case)
-            self.jwks_service.clear_cognito_cache()
-            jwks = self.jwks_service.get_cognito_jwks()
-            key = self._find_key(jwks, kid)
 
-        if not key:
-            logger.warning(f"Cognito token key not found: {kid}")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token key",
-            )
+class TokenPrefilter:
+    """
+    Cheap structural checks that reject junk bearer tokens before any crypto.
 
-        return jwt.decode(
-            token,
-            key.to_pem().decode("utf-8"),
-            algorithms=["RS256"],
-            audience=self.settings.cognito_client_id,
-            issuer=self.settings.cognito_issuer,
-            options={"verify_at_hash": False},
-        )
+    Rejects oversized tokens, wrong segment counts, disallowed ``alg`` values,
+    missing key IDs, unknown issuers and tokens that are already expired or
+    not yet valid. Every rejection is counted by reason for monitoring.
+    """
 
-    def _verify_google_token(self, token: str, kid: str) -> dict:
-        """Verify a Google JWT token."""
-        if not self.settings.google_client_id:
-            logger.error("Google client ID not configured")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Google authentication not configured",
-            )
+    ALLOWED_ALGORITHMS = frozenset({"RS256"})
+
+    def __init__(self, max_length: int, issuers: frozenset[str]):
+        self.max_length = max_length
+        self.issuers = issuers
+        self.rejections: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def _reject(
+        self, reason: str, detail: str = "Invalid or expired token"
+    ) -> NoReturn:
+        with self._lock:
+            self.rejections[reason] += 1
+        logger.debug(f"Bearer token rejected by prefilter: {reason}")
+        raise InvalidTokenError(reason, detail=detail)
+
+    def check_shape(self, token: str) -> None:
+        """Length and segment-count checks; no decoding involved."""
+        if len(token) > self.max_length:
+            self._reject("oversized")
+        if token.count(".") != 2:
+            self._reject("malformed")
+
+    def parse(self, token: str) -> ParsedToken:
+        """Parse a token and reject it if header or time claims rule it out."""
+        self.check_shape(token)
+        try:
+            parsed = ParsedToken.parse(token)
+        except JWTError:
+            self._reject("malformed")
+
+        if parsed.alg not in self.ALLOWED_ALGORITHMS:
+            self._reject("disallowed_alg")
+        if not parsed.kid:
+            self._reject("missing_kid", detail="Invalid token format")
+        if parsed.issuer not in self.issuers:
+            self._reject("unknown_issuer")
+
+        now = time.time()
+        try:
+            if "exp" in parsed.claims and int(parsed.claims["exp"]) < now:
+                self._reject("expired")
+            if "nbf" in parsed.claims and int(parsed.claims["nbf"]) > now:
+                self._reject("not_yet_valid")
+        except (TypeError, ValueError):
+            self._reject("malformed")
 
-        jwks = self.jwks_service.get_google_jwks()
-        key = self._find_key(jwks, kid)
+        return parsed
 
-        if not key:
-            self.jwks_service.clear_google_cache()
-            jwks = self.jwks_service.get_google_jwks()
-            key = self._find_key(jwks, kid)
+    def stats(self) -> dict[str, int]:
+        """Rejection counts by reason."""
+        with self._lock:
+            return dict(self.rejections)
 
-        if not key:
-            logger.warning(f"Google token key not found: {kid}")
+
+class JWTVerifier:
+    """
+    JWT verification service.
+
+    Verifies tokens from multiple issuers (Cognito, Google) using their respective JWKS.
+    """
+
+    GOOGLE_ISSUER = "https://accounts.google.com"
+
+    def __init__(
+        self,
+        settings: Settings,
+        jwks_service: JWKSService,
+        claims_cache: TTLCache | None = None,
+        prefilter: TokenPrefilter | None = None,
+        signature_verifier: SignatureVerifier | None = None,
+    ):
+        self.settings = settings
+        self.jwks_service = jwks_service
+        self.claims_cache = claims_cache
+        self.prefilter = prefilter
+        self.signature_verifier = signature_verifier or SignatureVerifier()
+
+    def _get_cached(self, cache_key: bytes) -> dict[str, Any] | None:
+        """Claims of a previously verified, unexpired token."""
+        if self.claims_cache is None:
+            return None
+        cached = self.claims_cache.get(cache_key)
+        return dict(cached) if cached is not None else None
+
+    def _store_cached(self, cache_key: bytes, claims: dict[str, Any]) -> None:
+        """Cache verified claims until the token's own expiry."""
+        exp = claims.get("exp")
+        if self.claims_cache is not None and isinstance(exp, int | float):
+            self.claims_cache.set(cache_key, dict(claims), expires_at=exp)
+
+    def _parse(self, token: str) -> tuple[ParsedToken, str]:
+        """
+        Decode header and claims once; every later step reuses them.
+
+        Returns the parsed token and its key ID, which must be present.
+        """
+        if self.prefilter is not None:
+            parsed = self.prefilter.parse(token)
+        else:
+            try:
+                parsed = ParsedToken.parse(token)
+            except JWTError as e:
+                logger.warning(f"JWT validation failed: {e}")
+                raise InvalidTokenError("malformed")
+
+        kid = parsed.kid
+        if not kid:
+            raise InvalidTokenError("missing_kid", detail="Invalid token format")
+        return parsed, kid
+
+    def _route(self, token: ParsedToken) -> str:
+        """Pick the JWKS issuer to validate against from the unverified issuer."""
+        if token.issuer == self.GOOGLE_ISSUER:
+            if not self.settings.google_client_id:
+                logger.error("Google client ID not configured")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Google authentication not configured",
+                )
+            return JWKSService.GOOGLE
+
+        # Default to Cognito validation
+        if (
+            not self.settings.cognito_user_pool_id
+            or not self.settings.cognito_client_id
+        ):
+            logger.error("Cognito not configured")
             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token key",
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Authentication not configured",
             )
+        return JWKSService.COGNITO
 
-        return jwt.decode(
-            token,
-            key.to_pem().decode("utf-8"),
-            algorithms=["RS256"],
-            audience=self.settings.google_client_id,
-            issuer="https://accounts.google.com",
-        )
+    async def _get_key(self, issuer: str, kid: str) -> Key:
+        """Look up the verification key for a token's kid."""
+        key = await self.jwks_service.get_key(issuer, kid)
+        if not key:
+            logger.warning(f"{issuer.capitalize()} token key not found: {kid}")
+            raise InvalidTokenError("unknown_key", detail="Invalid token key")
+        return key
+
+    async def _verify_with_key(
+        self, token: ParsedToken, issuer: str, key: Key
+    ) -> dict[str, Any]:
+        """Check the signature and registered claims for one issuer."""
+        try:
+            await self.signature_verifier.verify(token, key, algorithms=["RS256"])
+            if issuer == JWKSService.GOOGLE:
+                return token.validate_claims(
+                    issuers=(self.GOOGLE_ISSUER,),
+                    audiences=self.settings.google_client_ids,
+                )
+            return token.validate_claims(
+                issuers=(self.settings.cognito_issuer,),
+                audiences=frozenset((self.settings.cognito_client_id,)),
+            )
+        except ExpiredSignatureError as e:
+            logger.warning(f"JWT validation failed: {e}")
+            raise InvalidTokenError("expired")
+        except JWTClaimsError as e:
+            logger.warning(f"JWT validation failed: {e}")
+            raise InvalidTokenError("invalid_claims")
+        except JWTError as e:
+            logger.warning(f"JWT validation failed: {e}")
+            raise InvalidTokenError("invalid_signature")
 
-    def verify(self, token: str) -> dict:
+    async def verify(self, token: str) -> dict[str, Any]:
         """
         Verify JWT token from Cognito or Google and return claims.
 
         Detects the issuer from unverified claims to route to the correct verifier.
+        Previously verified tokens are served from the claims cache until they expire;
+        anything else passes the structural prefilter before signature verification.
         """
-        try:
-            unverified_header = jwt.get_unverified_header(token)
-            kid = unverified_header.get("kid")
+        if self.prefilter is not None:
+            self.prefilter.check_shape(token)
 
-            if not kid:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid token format",
-                )
+        cache_key = _cache_key(token)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
 
-            # Peek at the issuer to determine which provider to validate against
-            unverified_claims = jwt.get_unverified_claims(token)
-            issuer = unverified_claims.get("iss", "")
+        parsed, kid = self._parse(token)
+        issuer = self._route(parsed)
+        key = await self._get_key(issuer, kid)
+        claims = await self._verify_with_key(parsed, issuer, key)
 
-            if issuer == "https://accounts.google.com":
-                return self._verify_google_token(token, kid)
+        self._store_cached(cache_key, claims)
+        return claims
 
-            # Default to Cognito validation
-            if not self.settings.cognito_user_pool_id or not self.settings.cognito_client_id:
-                logger.error("Cognito not configured")
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Authentication not configured",
-                )
+    async def verify_many(self, tokens: list[str]) -> list[dict[str, Any] | Exception]:
+        """
+        Verify a batch of tokens, returning claims or the error for each.
 
-            return self._verify_cognito_token(token, kid)
+        Results are in input order. Tokens are grouped by issuer and key ID so
+        each key is looked up once per batch, and the signature checks in a
+        batch run concurrently. A failure while checking one token (including
+        a signature backend error) becomes that token's result; it never
+        fails the rest of the batch.
+        """
+        outcomes: dict[int, dict[str, Any] | Exception] = {}
+        groups: dict[tuple[str, str], list[tuple[int, bytes, ParsedToken]]] = {}
+
+        for index, token in enumerate(tokens):
+            try:
+                if self.prefilter is not None:
+                    self.prefilter.check_shape(token)
+                cache_key = _cache_key(token)
+                cached = self._get_cached(cache_key)
+                if cached is not None:
+                    outcomes[index] = cached
+                    continue
+                parsed, kid = self._parse(token)
+                issuer = self._route(parsed)
+            except HTTPException as e:
+                outcomes[index] = e
+                continue
+            groups.setdefault((issuer, kid), []).append((index, cache_key, parsed))
+
+        async def verify_one(
+            index: int, cache_key: bytes, parsed: ParsedToken, issuer: str, key: Key
+        ) -> None:
+            try:
+                claims = await self._verify_with_key(parsed, issuer, key)
+            except HTTPException as e:
+                outcomes[index] = e
+                return
+            except Exception as e:
+                logger.error(f"Token verification failed: {e!r}")
+                outcomes[index] = e
+                return
+            self._store_cached(cache_key, claims)
+            outcomes[index] = claims
+
+        async def verify_group(
+            issuer: str, kid: str, members: list[tuple[int, bytes, ParsedToken]]
+        ) -> None:
+            try:
+                key = await self._get_key(issuer, kid)
+            except (HTTPException, AppException) as e:
+                for index, _, _ in members:
+                    outcomes[index] = e
+                return
+            await asyncio.gather(
+                *(verify_one(i, ck, parsed, issuer, key) for i, ck, parsed in members)
+            )
 
-        except JWTError as e:
-            logger.warning(f"JWT validation failed: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired token",
+        await asyncio.gather(
+            *(
+                verify_group(issuer, kid, members)
+                for (issuer, kid), members in groups.items()
             )
+        )
+        return [outcomes[index] for index in range(len(tokens))]
+
+
+def _cache_key(token: str) -> bytes:
+    """Claims cache key: SHA-256 digest of the raw token."""
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+@lru_cache
+def get_token_prefilter() -> TokenPrefilter:
+    """Process-wide token prefilter (singleton, shares rejection counters)."""
+    settings = get_settings()
+    return TokenPrefilter(
+        max_length=settings.token_max_length,
+        issuers=frozenset((settings.cognito_issuer, JWTVerifier.GOOGLE_ISSUER)),
+    )
 
 
 def get_jwt_verifier(
     settings: Annotated[Settings, Depends(get_settings)],
     jwks_service: Annotated[JWKSService, Depends(get_jwks_service)],
+    claims_cache: Annotated[TTLCache, Depends(get_claims_cache)],
+    prefilter: Annotated[TokenPrefilter, Depends(get_token_prefilter)],
+    signature_verifier: Annotated[SignatureVerifier, Depends(get_signature_verifier)],
 ) -> JWTVerifier:
     """Dependency for JWT verifier."""
-    return JWTVerifier(settings, jwks_service)
+    return JWTVerifier(
+        settings, jwks_service, claims_cache, prefilter, signature_verifier
+    )
 
 
-def verify_token(
+async def verify_token(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(bearer_scheme)],
     jwt_verifier: Annotated[JWTVerifier, Depends(get_jwt_verifier)],
 ) -> dict:
@@ -156,7 +355,7 @@ def verify_token(
     Extracts Bearer token from Authorization header and verifies it.
     Returns the verified claims dictionary.
     """
-    return jwt_verifier.verify(credentials.credentials)
+    return await jwt_verifier.verify(credentials.credentials)
 
 
 # Type alias for dependency injection
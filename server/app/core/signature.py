@@ -0,0 +1,178 @@
+"""
+Signature verification backends for JWT checking.
+
+RS256 verification is CPU-bound. The default backend runs it inline on the
+event loop; the thread and process backends move it onto a sized executor so
+a single uvicorn worker can spread signature checks across cores.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import weakref
+from collections.abc import Collection, Iterable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any
+
+from jose import jwk
+from jose.backends.base import Key
+from jose.exceptions import JWTError
+
+from app.core.config import get_settings
+from app.core.tokens import ParsedToken
+from app.services.jwks_service import get_jwks_service
+
+logger = logging.getLogger(__name__)
+
+ALGORITHMS = ("RS256",)
+
+
+class SignatureVerifier:
+    """Verify token signatures inline on the calling thread / event loop."""
+
+    name = "inline"
+
+    async def verify(
+        self, token: ParsedToken, key: Key, algorithms: Collection[str] = ALGORITHMS
+    ) -> None:
+        """Check the token signature. Raises JWTError if it does not match."""
+        token.verify_signature(key, algorithms)
+
+    def close(self) -> None:
+        """Release any executor resources."""
+
+
+class ThreadPoolSignatureVerifier(SignatureVerifier):
+    """Verify signatures on a dedicated, sized thread pool."""
+
+    name = "thread"
+
+    def __init__(self, workers: int):
+        self.executor: Executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="jwt-verify"
+        )
+
+    async def verify(
+        self, token: ParsedToken, key: Key, algorithms: Collection[str] = ALGORITHMS
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            self.executor, token.verify_signature, key, algorithms
+        )
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Per-worker-process cache of constructed keys, keyed by RSA modulus/exponent
+_worker_keys: dict[tuple[str, str], Key] = {}
+
+
+def _worker_key(jwk_data: dict[str, Any]) -> Key:
+    """Get (or construct once) a verification key inside a pool worker."""
+    cache_key = (jwk_data["n"], jwk_data["e"])
+    key = _worker_keys.get(cache_key)
+    if key is None:
+        key = jwk.construct(jwk_data, jwk_data.get("alg", "RS256"))
+        _worker_keys[cache_key] = key
+    return key
+
+
+def _init_worker(jwks: list[dict[str, Any]]) -> None:
+    """Process pool initializer: pre-load the current public keys."""
+    for jwk_data in jwks:
+        _worker_key(jwk_data)
+
+
+def _verify_in_worker(
+    jwk_data: dict[str, Any], signing_input: bytes, signature: bytes
+) -> bool:
+    """Signature check executed in a pool worker process."""
+    try:
+        return bool(_worker_key(jwk_data).verify(signing_input, signature))
+    except Exception:
+        return False
+
+
+class ProcessPoolSignatureVerifier(SignatureVerifier):
+    """
+    Verify signatures in a sized process pool, outside the GIL.
+
+    Workers are started with the currently known public keys pre-loaded;
+    keys that appear later (rotation) are constructed once per worker on
+    first use. Only the JWK, signing input and signature cross the process
+    boundary.
+    """
+
+    name = "process"
+
+    def __init__(self, workers: int, preload: Iterable[Key] = ()):
+        self._jwk_data: weakref.WeakKeyDictionary[Key, dict[str, Any]] = (
+            weakref.WeakKeyDictionary()
+        )
+        self.executor: Executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=([self._to_jwk(key) for key in preload],),
+        )
+
+    def _to_jwk(self, key: Key) -> dict[str, Any]:
+        """Public JWK for a key, serialized once per key object."""
+        jwk_data = self._jwk_data.get(key)
+        if jwk_data is None:
+            jwk_data = key.to_dict()
+            self._jwk_data[key] = jwk_data
+        return jwk_data
+
+    async def verify(
+        self, token: ParsedToken, key: Key, algorithms: Collection[str] = ALGORITHMS
+    ) -> None:
+        if token.alg not in algorithms:
+            raise JWTError("The specified alg value is not allowed")
+
+        loop = asyncio.get_running_loop()
+        valid = await loop.run_in_executor(
+            self.executor,
+            _verify_in_worker,
+            self._to_jwk(key),
+            token.signing_input,
+            token.signature,
+        )
+        if not valid:
+            raise JWTError("Signature verification failed.")
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_signature_verifier(
+    backend: str, workers: int = 0, preload: Iterable[Key] = ()
+) -> SignatureVerifier:
+    """Build the signature verification backend named in settings."""
+    workers = workers or os.cpu_count() or 1
+    if backend == "inline":
+        return SignatureVerifier()
+    if backend == "thread":
+        return ThreadPoolSignatureVerifier(workers)
+    if backend == "process":
+        return ProcessPoolSignatureVerifier(workers, preload)
+    raise ValueError(f"Unknown JWT verification backend: {backend}")
+
+
+@lru_cache
+def get_signature_verifier() -> SignatureVerifier:
+    """Process-wide signature verification backend (singleton)."""
+    settings = get_settings()
+    preload = [
+        key
+        for key_set in get_jwks_service().key_sets.values()
+        for key in key_set.keys.values()
+    ]
+    verifier = create_signature_verifier(
+        settings.jwt_verify_backend, settings.jwt_verify_workers, preload
+    )
+    logger.info(f"JWT signature verification backend: {verifier.name}")
+    return verifier
@@ -0,0 +1,45 @@
+"""
+Request coalescing for concurrent async work.
+
+Lets many concurrent callers asking for the same thing share one
+in-flight operation instead of each starting their own.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into a single execution.
+
+    The first caller for a key starts the work; callers arriving while it
+    is still running await the same result (or exception). Once it
+    finishes the key is released, so the next call starts fresh work.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, asyncio.Future[Any]] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fn`` for ``key`` unless an identical call is already in flight."""
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._release(key, f))
+
+        # Shield so one cancelled waiter doesn't cancel the shared work
+        return await asyncio.shield(future)
+
+    def _release(self, key: Hashable, future: asyncio.Future[Any]) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        # Mark the exception as retrieved if every waiter was cancelled
+        if not future.cancelled():
+            future.exception()
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Whether work for ``key`` is currently running."""
+        return key in self._inflight
@@ -0,0 +1,160 @@
+"""
+JWT parsing and claim validation shared by the token verifiers.
+
+A token is split, base64-decoded and JSON-parsed exactly once into a
+``ParsedToken``; issuer routing, key lookup, signature verification and
+claim validation all work from that object.
+"""
+
+import json
+import time
+from collections.abc import Collection
+from dataclasses import dataclass
+from typing import Any
+
+from jose.backends.base import Key
+from jose.exceptions import ExpiredSignatureError, JWTClaimsError, JWTError
+from jose.utils import base64url_decode
+
+
+@dataclass(frozen=True, slots=True)
+class ParsedToken:
+    """A compact JWS split and decoded once, not yet verified."""
+
+    raw: str
+    header: dict[str, Any]
+    claims: dict[str, Any]
+    signing_input: bytes
+    signature: bytes
+
+    @classmethod
+    def parse(cls, token: str) -> "ParsedToken":
+        """Decode header, claims and signature. Raises JWTError if malformed."""
+        try:
+            signing_input, signature_segment = token.encode("utf-8").rsplit(b".", 1)
+            header_segment, claims_segment = signing_input.split(b".", 1)
+        except ValueError:
+            raise JWTError("Not enough segments")
+
+        try:
+            header = json.loads(base64url_decode(header_segment))
+        except (ValueError, TypeError):
+            raise JWTError("Error decoding token headers.")
+        if not isinstance(header, dict):
+            raise JWTError("Invalid header string: must be a json object")
+
+        try:
+            claims = json.loads(base64url_decode(claims_segment))
+        except (ValueError, TypeError):
+            raise JWTError("Invalid payload string")
+        if not isinstance(claims, dict):
+            raise JWTError("Invalid payload string: must be a json object")
+
+        try:
+            signature = base64url_decode(signature_segment)
+        except (ValueError, TypeError):
+            raise JWTError("Invalid crypto padding")
+
+        return cls(token, header, claims, signing_input, signature)
+
+    @property
+    def kid(self) -> str | None:
+        return self.header.get("kid")
+
+    @property
+    def alg(self) -> str | None:
+        return self.header.get("alg")
+
+    @property
+    def issuer(self) -> str:
+        issuer = self.claims.get("iss")
+        return issuer if isinstance(issuer, str) else ""
+
+    def verify_signature(self, key: Key, algorithms: Collection[str]) -> None:
+        """Check the signature against a pre-constructed key. Raises JWTError."""
+        if self.alg not in algorithms:
+            raise JWTError("The specified alg value is not allowed")
+        try:
+            valid = key.verify(self.signing_input, self.signature)
+        except Exception:
+            valid = False
+        if not valid:
+            raise JWTError("Signature verification failed.")
+
+    def validate_claims(
+        self,
+        *,
+        issuers: Collection[str] | None = None,
+        audiences: Collection[str] | None = None,
+        leeway: int = 0,
+    ) -> dict[str, Any]:
+        """
+        Validate registered claims and return the claims dict.
+
+        Follows python-jose's rules: ``exp``/``nbf``/``iat`` are checked when
+        present (``exp`` and ``nbf`` with ``leeway`` seconds of clock skew),
+        ``iss`` must be one of ``issuers`` and ``aud`` must match one of
+        ``audiences`` when those are given. ``at_hash`` is not checked: the
+        Apple and Google exchanges receive no access token to compare it
+        with, and were decoded with ``verify_at_hash=False`` before.
+        """
+        claims = self.claims
+        now = int(time.time())
+
+        for name in ("iat", "nbf", "exp"):
+            if name in claims and not _is_int_like(claims[name]):
+                raise JWTClaimsError(f"Claim ({name}) must be an integer.")
+        if "nbf" in claims and int(claims["nbf"]) > now + leeway:
+            raise JWTClaimsError("The token is not yet valid (nbf)")
+        if "exp" in claims and int(claims["exp"]) < now - leeway:
+            raise ExpiredSignatureError("Signature has expired.")
+
+        if audiences is not None:
+            validate_audience(claims, audiences)
+        if issuers is not None and claims.get("iss") not in issuers:
+            raise JWTClaimsError("Invalid issuer")
+
+        if "sub" in claims and not isinstance(claims["sub"], str):
+            raise JWTClaimsError("Subject must be a string.")
+        if "jti" in claims and not isinstance(claims["jti"], str):
+            raise JWTClaimsError("JWT ID must be a string.")
+
+        return claims
+
+
+def _is_int_like(value: object) -> bool:
+    """Whether a NumericDate claim value can be read as an integer."""
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, int | float):
+        return True
+    if isinstance(value, str):
+        try:
+            int(value)
+        except ValueError:
+            return False
+        return True
+    return False
+
+
+def validate_audience(claims: dict[str, Any], audiences: Collection[str]) -> None:
+    """
+    Check the ``aud`` claim against a set of allowed audiences.
+
+    Lets a token be verified once and then matched against every configured
+    client ID, instead of re-running verification per audience. Mirrors
+    python-jose's audience rules and error messages.
+    """
+    if "aud" not in claims:
+        return
+
+    audience_claims = claims["aud"]
+    if isinstance(audience_claims, str):
+        audience_claims = [audience_claims]
+    if not isinstance(audience_claims, list) or any(
+        not isinstance(aud, str) for aud in audience_claims
+    ):
+        raise JWTClaimsError("Invalid claim format in token")
+
+    if frozenset(audiences).isdisjoint(audience_claims):
+        raise JWTClaimsError("Invalid audience")
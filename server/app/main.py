@@ -5,7 +5,9 @@ Uses app factory pattern for flexible configuration.
 """
 
 import logging
+from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
+from typing import Any
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
@@ -24,10 +26,25 @@ from app.core.exceptions import (
 )
 from app.core.logging import setup_logging
 from app.core.middleware import (
+    DeadlineMiddleware,
     LoggingMiddleware,
     RequestIDMiddleware,
     SecurityHeadersMiddleware,
 )
+from app.core.security import get_claims_cache, get_token_prefilter
+from app.core.signature import get_signature_verifier
+from app.providers.cognito import (
+    CognitoProvider,
+    get_cognito_breaker,
+    get_cognito_client,
+    get_cognito_executor,
+    get_cognito_metrics,
+    get_cognito_scheduler,
+    get_known_user_cache,
+)
+from app.repositories.sqlite_user_repository import get_sqlite_user_repository
+from app.repositories.user_repository import get_json_user_repository
+from app.services.jwks_service import get_jwks_service
 
 # Load environment variables
 load_dotenv()
@@ -36,7 +53,7 @@ logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
-async def lifespan(app: FastAPI):
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     """Application lifespan handler for startup/shutdown."""
     settings = get_settings()
 
@@ -54,10 +71,35 @@ async def lifespan(app: FastAPI):
         logger.error(f"Configuration error: {e}")
         raise
 
+    # Serve persisted JWKS immediately, then preload/refresh in the background
+    jwks_service = get_jwks_service()
+    await jwks_service.load_snapshots()
+    await jwks_service.start()
+
+    # Create the shared Cognito client and open its first connection
+    await CognitoProvider(
+        settings, get_cognito_executor(), get_cognito_client()
+    ).warm_up()
+
+    # Replay the JSON user store and start compacting its append log
+    if settings.user_store == "json":
+        await get_json_user_repository().load()
+        await get_json_user_repository().start()
+
+    # Start the signature verification backend with the preloaded keys
+    signature_verifier = get_signature_verifier()
+
     yield
 
     # Shutdown
     logger.info("Shutting down application")
+    signature_verifier.close()
+    get_cognito_executor().shutdown(wait=False, cancel_futures=True)
+    await jwks_service.stop()
+    if settings.user_store == "sqlite":
+        get_sqlite_user_repository().close()
+    else:
+        await get_json_user_repository().stop()
 
 
 def create_app() -> FastAPI:
@@ -82,6 +124,11 @@ def create_app() -> FastAPI:
     app.add_middleware(SecurityHeadersMiddleware)
     app.add_middleware(LoggingMiddleware)
     app.add_middleware(RequestIDMiddleware)
+    app.add_middleware(
+        DeadlineMiddleware,
+        default_budget=settings.request_budget_seconds,
+        route_budgets=settings.route_budgets,
+    )
 
     app.add_middleware(
         CORSMiddleware,
@@ -89,7 +136,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
         allow_headers=["Content-Type", "Authorization", "X-Request-ID"],
-        expose_headers=["X-Request-ID"],
+        expose_headers=["X-Request-ID", "X-Next-Cursor"],
     )
 
     # Exception handlers
@@ -116,6 +163,29 @@ def create_app() -> FastAPI:
             "environment": settings.environment,
         }
 
+    @app.get("/metrics", tags=["health"])
+    def metrics() -> dict[str, Any]:
+        """In-process cache and performance counters for monitoring."""
+        user_writes = (
+            get_json_user_repository().writer.stats()
+            if settings.user_store == "json"
+            else None
+        )
+        return {
+            "token_cache": get_claims_cache().stats(),
+            "token_rejections": get_token_prefilter().stats(),
+            "jwks_age_seconds": get_jwks_service().refresh_ages(),
+            "jwks_unknown_kids": get_jwks_service().unknown_kids.stats(),
+            "cognito": get_cognito_metrics().stats(),
+            "cognito_known_users": get_known_user_cache().stats(),
+            "cognito_quota": get_cognito_scheduler().stats(),
+            "circuit_breakers": {
+                "cognito": get_cognito_breaker().stats(),
+                **get_jwks_service().breaker_states(),
+            },
+            "user_writes": user_writes,
+        }
+
     return app
 
 
@@ -3,12 +3,13 @@ Apple Sign-In provider for token verification.
 """
 
 import logging
-from typing import Annotated
+from typing import Annotated, Any
 
 from fastapi import Depends, HTTPException, status
-from jose import JWTError, jwt, jwk
+from jose import JWTError
 
 from app.core.config import Settings, get_settings
+from app.core.tokens import ParsedToken
 from app.services.jwks_service import JWKSService, get_jwks_service
 
 logger = logging.getLogger(__name__)
@@ -27,14 +28,7 @@ class AppleProvider:
         self.settings = settings
         self.jwks_service = jwks_service
 
-    def _find_key(self, jwks: dict, kid: str):
-        """Find a matching key in a JWKS by key ID."""
-        for key in jwks.get("keys", []):
-            if key.get("kid") == kid:
-                return jwk.construct(key)
-        return None
-
-    def verify_token(self, identity_token: str) -> dict:
+    async def verify_token(self, identity_token: str) -> dict[str, Any]:
         """
         Verify Apple identity token and return claims.
 
@@ -50,8 +44,8 @@ class AppleProvider:
             )
 
         try:
-            unverified_header = jwt.get_unverified_header(identity_token)
-            kid = unverified_header.get("kid")
+            token = ParsedToken.parse(identity_token)
+            kid = token.kid
 
             if not kid:
                 raise HTTPException(
@@ -59,15 +53,8 @@ class AppleProvider:
                     detail="Invalid Apple token format",
                 )
 
-            # Find matching key in Apple's JWKS
-            jwks = self.jwks_service.get_apple_jwks()
-            key = self._find_key(jwks, kid)
-
-            if not key:
-                # Clear cache and retry (key rotation case)
-                self.jwks_service.clear_apple_cache()
-                jwks = self.jwks_service.get_apple_jwks()
-                key = self._find_key(jwks, kid)
+            # Find matching key in Apple's JWKS (refetched on rotation)
+            key = await self.jwks_service.get_key(JWKSService.APPLE, kid)
 
             if not key:
                 logger.warning(f"Apple token key not found: {kid}")
@@ -76,29 +63,9 @@ class AppleProvider:
                     detail="Invalid Apple token key",
                 )
 
-            # Try each bundle ID (python-jose doesn't support list of audiences)
-            claims = None
-            last_error = None
-
-            for bundle_id in bundle_ids:
-                try:
-                    claims = jwt.decode(
-                        identity_token,
-                        key.to_pem().decode("utf-8"),
-                        algorithms=["RS256"],
-                        issuer=self.ISSUER,
-                        audience=bundle_id,
-                        options={"verify_at_hash": False},
-                    )
-                    break  # Successfully decoded
-                except JWTError as e:
-                    last_error = e
-                    continue
-
-            if claims is None:
-                raise last_error or JWTError("No valid audience found")
-
-            return claims
+            # Verify the signature once, then match any configured bundle ID
+            token.verify_signature(key, algorithms=["RS256"])
+            return token.validate_claims(issuers=(self.ISSUER,), audiences=bundle_ids)
 
         except JWTError as e:
             logger.warning(f"Apple JWT validation failed: {e}")
@@ -2,42 +2,261 @@
 AWS Cognito provider for user management and authentication.
 """
 
+import asyncio
 import logging
 import secrets
 import string
-from typing import Annotated
+import time
+from collections import Counter
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Annotated, Any, NoReturn
 
 import boto3
-from botocore.exceptions import ClientError
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
 from fastapi import Depends, HTTPException, status
 
+from app.core.cache import TTLCache
+from app.core.circuit import CircuitBreaker, CircuitOpenError
 from app.core.config import Settings, get_settings
+from app.core.deadline import remaining, timeout_for
+from app.core.exceptions import DeadlineExceededError, ExternalServiceError
+from app.core.ratelimit import QuotaExceededError, QuotaScheduler, decorrelated_jitter
 from app.schemas.auth import AuthTokenResponse
 
 logger = logging.getLogger(__name__)
 
+# Error codes Cognito returns when a request exceeds an API quota
+THROTTLE_ERROR_CODES = frozenset({"TooManyRequestsException", "ThrottlingException"})
+# botocore's connect/read timeout when no request budget bounds it (seconds)
+DEFAULT_SOCKET_TIMEOUT = 60.0
+
+
+class CognitoMetrics:
+    """
+    Cognito API call counters, by operation and by sign-in flow.
+
+    Updated from the event loop only, so no locking is needed.
+    """
+
+    def __init__(self) -> None:
+        self.calls: Counter[str] = Counter()
+        self.sign_ins: Counter[str] = Counter()
+        self.sign_in_calls: Counter[str] = Counter()
+
+    def record_call(self, operation: str) -> None:
+        self.calls[operation] += 1
+
+    def record_sign_in(self, flow: str, calls: int) -> None:
+        self.sign_ins[flow] += 1
+        self.sign_in_calls[flow] += calls
+
+    def stats(self) -> dict[str, Any]:
+        """Call counts per operation and average calls per sign-in flow."""
+        return {
+            "calls": dict(self.calls),
+            "sign_ins": {
+                flow: {
+                    "count": count,
+                    "avg_calls": round(self.sign_in_calls[flow] / count, 2),
+                }
+                for flow, count in self.sign_ins.items()
+            },
+        }
+
 
 class CognitoProvider:
     """
     AWS Cognito Identity Provider wrapper.
 
     Handles user creation, lookup, and token generation.
+
+    boto3 is synchronous, so every Cognito call runs on a dedicated, bounded
+    thread pool and is awaited. A sign-in waiting on Cognito never blocks
+    the event loop for other requests. The boto3 client is shared process
+    wide (see ``get_cognito_client``) so connections are reused.
+
+    Usernames confirmed to exist are remembered in ``known_users`` for
+    ``cognito_known_user_ttl`` seconds, so returning users skip the
+    existence check. An entry is dropped as soon as a Cognito call for that
+    user returns ``UserNotFoundException``.
+
+    With a ``QuotaScheduler`` every call first waits for its operation's
+    quota. Calls Cognito still throttles are retried with decorrelated
+    jitter; a call that can't be scheduled or keeps being throttled raises
+    ``ExternalServiceError`` (503).
+
+    With a ``CircuitBreaker`` every request's outcome and latency is
+    recorded; while the breaker is open calls fail fast with
+    ``ExternalServiceError`` instead of waiting on a degraded Cognito.
+
+    Calls made inside a request use the request's remaining deadline budget
+    as their timeout (and as the longest quota wait), and raise
+    ``DeadlineExceededError`` (504) once it is spent.
     """
 
-    def __init__(self, settings: Settings):
+    WARM_UP_TIMEOUT = 5.0
+
+    def __init__(
+        self,
+        settings: Settings,
+        executor: Executor | None = None,
+        client: Any = None,
+        metrics: CognitoMetrics | None = None,
+        known_users: TTLCache | None = None,
+        scheduler: QuotaScheduler | None = None,
+        breaker: CircuitBreaker | None = None,
+    ):
         self.settings = settings
-        self._client = None
+        self.executor = executor
+        self.metrics = metrics or CognitoMetrics()
+        self.known_users = known_users
+        self.scheduler = scheduler
+        self.breaker = breaker
+        self.call_count = 0
+        self._client = client
 
     @property
-    def client(self):
+    def client(self) -> Any:
         """Lazy initialization of Cognito client."""
         if self._client is None:
-            self._client = boto3.client(
-                "cognito-idp",
-                region_name=self.settings.aws_region,
-            )
+            self._client = create_cognito_client(self.settings)
         return self._client
 
+    def _invoke(self, operation: str, params: dict[str, Any]) -> dict[str, Any]:
+        """Run a boto3 operation (executed on a pool thread)."""
+        response: dict[str, Any] = getattr(self.client, operation)(**params)
+        return response
+
+    async def _call(self, operation: str, **params: Any) -> dict[str, Any]:
+        """Run a Cognito API operation on the executor and await its response."""
+        loop = asyncio.get_running_loop()
+        delay = self.settings.cognito_retry_base_delay
+        attempt = 0
+        while True:
+            try:
+                return await self._attempt(loop, operation, params)
+            except ClientError as e:
+                if e.response["Error"]["Code"] not in THROTTLE_ERROR_CODES:
+                    raise
+                if self.scheduler is not None:
+                    self.scheduler.record_throttle(operation)
+                if attempt >= self.settings.cognito_throttle_retries:
+                    logger.error(f"Cognito {operation} still throttled: {e}")
+                    raise ExternalServiceError("Cognito")
+
+            attempt += 1
+            delay = decorrelated_jitter(
+                delay,
+                self.settings.cognito_retry_base_delay,
+                self.settings.cognito_retry_max_delay,
+            )
+            budget = remaining()
+            if budget is not None and delay >= budget:
+                raise DeadlineExceededError("Cognito")
+            await asyncio.sleep(delay)
+
+    async def _attempt(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        operation: str,
+        params: dict[str, Any],
+    ) -> dict[str, Any]:
+        """
+        One Cognito request, admitted and measured by the circuit breaker.
+
+        The quota is acquired before the breaker admits the call: a call the
+        scheduler rejects never reaches Cognito, so it must not take one of
+        the breaker's half-open trial slots.
+        """
+        await self._acquire(operation)
+        # A spent budget raises here, before the call is admitted or submitted
+        timeout = timeout_for("Cognito")
+        self._allow(operation)
+        self.call_count += 1
+        self.metrics.record_call(operation)
+
+        start = time.monotonic()
+        try:
+            response = await asyncio.wait_for(
+                loop.run_in_executor(self.executor, self._invoke, operation, params),
+                timeout=timeout,
+            )
+        except TimeoutError:
+            # Stop waiting; the worker thread finishes the call on its own
+            self._record(start, failed=True)
+            logger.warning(f"Cognito {operation} exceeded the request deadline")
+            raise DeadlineExceededError("Cognito")
+        except ClientError as e:
+            status_code = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+            self._record(start, failed=(status_code or 0) >= 500)
+            raise
+        except BotoCoreError as e:
+            self._record(start, failed=True)
+            logger.error(f"Cognito {operation} failed: {e}")
+            raise ExternalServiceError("Cognito")
+
+        self._record(start, failed=False)
+        return response
+
+    def _allow(self, operation: str) -> None:
+        """Fail fast while the Cognito circuit breaker is open."""
+        if self.breaker is None:
+            return
+        try:
+            self.breaker.allow()
+        except CircuitOpenError as e:
+            logger.warning(f"Cognito {operation} not attempted: {e}")
+            raise ExternalServiceError("Cognito")
+
+    def _record(self, start: float, failed: bool) -> None:
+        if self.breaker is not None:
+            self.breaker.record(time.monotonic() - start, failed=failed)
+
+    async def _acquire(self, operation: str) -> None:
+        """Wait for the operation's quota, if a scheduler is configured."""
+        if self.scheduler is None:
+            return
+        try:
+            await self.scheduler.acquire(operation, max_wait=timeout_for("Cognito"))
+        except QuotaExceededError as e:
+            logger.warning(f"Cognito call not scheduled: {e}")
+            raise ExternalServiceError("Cognito")
+
+    async def warm_up(self) -> None:
+        """
+        Make one cheap call so credentials, endpoint resolution and the first
+        TLS connection are set up before real traffic. Failures are logged
+        and ignored.
+        """
+        try:
+            await asyncio.wait_for(
+                self._call(
+                    "describe_user_pool",
+                    UserPoolId=self.settings.cognito_user_pool_id,
+                ),
+                timeout=self.WARM_UP_TIMEOUT,
+            )
+            logger.info("Cognito client warmed up")
+        except (ClientError, ExternalServiceError, TimeoutError) as e:
+            logger.warning(f"Cognito warm-up call failed: {e}")
+
+    def _is_known_user(self, username: str) -> bool:
+        return self.known_users is not None and bool(self.known_users.get(username))
+
+    def _remember_user(self, username: str) -> None:
+        if self.known_users is not None:
+            self.known_users.set(
+                username,
+                True,
+                expires_at=time.time() + self.settings.cognito_known_user_ttl,
+            )
+
+    def _forget_user(self, username: str) -> None:
+        if self.known_users is not None:
+            self.known_users.delete(username)
+
     @staticmethod
     def _generate_password() -> str:
         """
@@ -50,14 +269,15 @@ class CognitoProvider:
         # Ensure at least one of each required character type
         return "Aa1!" + password[4:]
 
-    def get_user(self, username: str) -> dict | None:
+    async def get_user(self, username: str) -> dict[str, Any] | None:
         """
         Get user by username.
 
         Returns user attributes or None if not found.
         """
         try:
-            response = self.client.admin_get_user(
+            response = await self._call(
+                "admin_get_user",
                 UserPoolId=self.settings.cognito_user_pool_id,
                 Username=username,
             )
@@ -71,7 +291,7 @@ class CognitoProvider:
                 detail="Failed to lookup user",
             )
 
-    def create_user(
+    async def create_user(
         self,
         email: str,
         name: str | None = None,
@@ -82,6 +302,39 @@ class CognitoProvider:
         Returns the username (email).
         """
         username = email
+        if not await self._create_user_if_missing(email, name):
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to create user account",
+            )
+
+        try:
+            # Set a random password and confirm the user
+            temp_password = self._generate_password()
+            await self._call(
+                "admin_set_user_password",
+                UserPoolId=self.settings.cognito_user_pool_id,
+                Username=username,
+                Password=temp_password,
+                Permanent=True,
+            )
+
+            return username
+
+        except ClientError as e:
+            logger.error(f"Failed to create user: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to create user account",
+            )
+
+    async def _create_user_if_missing(self, email: str, name: str | None) -> bool:
+        """
+        Create a user without a password, optimistically.
+
+        Returns True if the user was created and False if it already existed
+        (``UsernameExistsException``), in one Cognito call either way.
+        """
         user_attributes = [
             {"Name": "email", "Value": email},
             {"Name": "email_verified", "Value": "true"},
@@ -91,33 +344,27 @@ class CognitoProvider:
             user_attributes.append({"Name": "name", "Value": name})
 
         try:
-            self.client.admin_create_user(
+            await self._call(
+                "admin_create_user",
                 UserPoolId=self.settings.cognito_user_pool_id,
-                Username=username,
+                Username=email,
                 UserAttributes=user_attributes,
                 MessageAction="SUPPRESS",  # Don't send welcome email
             )
-
-            # Set a random password and confirm the user
-            temp_password = self._generate_password()
-            self.client.admin_set_user_password(
-                UserPoolId=self.settings.cognito_user_pool_id,
-                Username=username,
-                Password=temp_password,
-                Permanent=True,
-            )
-
-            logger.info(f"Created new user: {username}")
-            return username
-
         except ClientError as e:
+            if e.response["Error"]["Code"] == "UsernameExistsException":
+                logger.info(f"Found existing user: {email}")
+                return False
             logger.error(f"Failed to create user: {e}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to create user account",
             )
 
-    def get_or_create_user(
+        logger.info(f"Created new user: {email}")
+        return True
+
+    async def get_or_create_user(
         self,
         email: str,
         name: str | None = None,
@@ -127,20 +374,68 @@ class CognitoProvider:
 
         Returns the Cognito username (email).
         """
-        if not email:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email is required for sign-in",
-            )
+        self._require_email(email)
+
+        if self._is_known_user(email):
+            return email
 
-        existing_user = self.get_user(email)
+        existing_user = await self.get_user(email)
         if existing_user:
             logger.info(f"Found existing user: {email}")
+            self._remember_user(email)
             return email
 
-        return self.create_user(email, name)
+        username = await self.create_user(email, name)
+        self._remember_user(username)
+        return username
+
+    @staticmethod
+    def _require_email(email: str | None) -> str:
+        if not email:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email is required for sign-in",
+            )
+        return email
 
-    def initiate_auth(self, username: str) -> AuthTokenResponse:
+    async def sign_in(
+        self,
+        email: str | None,
+        name: str | None = None,
+    ) -> AuthTokenResponse:
+        """
+        Make sure a user exists and issue Cognito tokens for it.
+
+        The optimised social sign-in path: creates the user optimistically
+        (an existing user costs the same single call as a lookup) and leaves
+        the password to ``initiate_auth``, which sets one anyway. New users
+        take three Cognito calls; known users skip the create and take two.
+        If a known user has since been deleted, the sign-in is retried once
+        through the create path.
+        """
+        email = self._require_email(email)
+
+        calls_before = self.call_count
+        flow = "known_user"
+        tokens = None
+        if self._is_known_user(email):
+            try:
+                tokens = await self._authenticate(email)
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "UserNotFoundException":
+                    self._auth_failed(e)
+                logger.info(f"Known user no longer exists, recreating: {email}")
+
+        if tokens is None:
+            created = await self._create_user_if_missing(email, name)
+            flow = "new_user" if created else "returning_user"
+            tokens = await self.initiate_auth(email)
+
+        self._remember_user(email)
+        self.metrics.record_sign_in(flow, self.call_count - calls_before)
+        return tokens
+
+    async def initiate_auth(self, username: str) -> AuthTokenResponse:
         """
         Initiate authentication for a user.
 
@@ -148,17 +443,63 @@ class CognitoProvider:
         Returns Cognito tokens.
         """
         try:
-            # Generate and set a new password for auth
-            temp_password = self._generate_password()
+            return await self._authenticate(username)
+        except ClientError as e:
+            self._auth_failed(e)
+
+    async def refresh_tokens(self, refresh_token: str) -> AuthTokenResponse:
+        """
+        Exchange a refresh token for new ID/access tokens (REFRESH_TOKEN_AUTH).
 
-            self.client.admin_set_user_password(
+        One Cognito call. Cognito does not rotate the refresh token here, so
+        the caller's refresh token is returned alongside the new tokens.
+        """
+        try:
+            response = await self._call(
+                "admin_initiate_auth",
+                UserPoolId=self.settings.cognito_user_pool_id,
+                ClientId=self.settings.cognito_client_id,
+                AuthFlow="REFRESH_TOKEN_AUTH",
+                AuthParameters={"REFRESH_TOKEN": refresh_token},
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "NotAuthorizedException":
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid or expired refresh token",
+                )
+            self._auth_failed(e)
+
+        auth_result = response.get("AuthenticationResult", {})
+
+        return AuthTokenResponse(
+            id_token=auth_result.get("IdToken", ""),
+            access_token=auth_result.get("AccessToken", ""),
+            refresh_token=auth_result.get("RefreshToken", refresh_token),
+            expires_in=auth_result.get("ExpiresIn", 3600),
+        )
+
+    async def _authenticate(self, username: str) -> AuthTokenResponse:
+        """
+        Set a fresh password and run ADMIN_USER_PASSWORD_AUTH.
+
+        Raises ClientError; ``UserNotFoundException`` also drops the user
+        from the known-user cache.
+        """
+        # Generate and set a new password for auth
+        temp_password = self._generate_password()
+
+        try:
+            await self._call(
+                "admin_set_user_password",
                 UserPoolId=self.settings.cognito_user_pool_id,
                 Username=username,
                 Password=temp_password,
                 Permanent=True,
             )
 
-            response = self.client.admin_initiate_auth(
+            response = await self._call(
+                "admin_initiate_auth",
                 UserPoolId=self.settings.cognito_user_pool_id,
                 ClientId=self.settings.cognito_client_id,
                 AuthFlow="ADMIN_USER_PASSWORD_AUTH",
@@ -167,26 +508,105 @@ class CognitoProvider:
                     "PASSWORD": temp_password,
                 },
             )
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "UserNotFoundException":
+                self._forget_user(username)
+            raise
 
-            auth_result = response.get("AuthenticationResult", {})
+        auth_result = response.get("AuthenticationResult", {})
 
-            return AuthTokenResponse(
-                id_token=auth_result.get("IdToken", ""),
-                access_token=auth_result.get("AccessToken", ""),
-                refresh_token=auth_result.get("RefreshToken"),
-                expires_in=auth_result.get("ExpiresIn", 3600),
-            )
+        return AuthTokenResponse(
+            id_token=auth_result.get("IdToken", ""),
+            access_token=auth_result.get("AccessToken", ""),
+            refresh_token=auth_result.get("RefreshToken"),
+            expires_in=auth_result.get("ExpiresIn", 3600),
+        )
 
-        except ClientError as e:
-            logger.error(f"Failed to authenticate user: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to authenticate user",
-            )
+    @staticmethod
+    def _auth_failed(error: ClientError) -> NoReturn:
+        logger.error(f"Failed to authenticate user: {error}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to authenticate user",
+        )
+
+
+def create_cognito_client(settings: Settings) -> Any:
+    """
+    Build a boto3 cognito-idp client with a pool-tuned configuration.
+
+    Socket timeouts are capped by the largest request budget, so a worker
+    thread whose caller hit its deadline is freed soon after instead of
+    blocking through botocore's 60 second default.
+    """
+    timeout = settings.max_request_budget or DEFAULT_SOCKET_TIMEOUT
+    config = Config(
+        max_pool_connections=settings.cognito_max_pool_connections,
+        tcp_keepalive=True,
+        connect_timeout=min(timeout, DEFAULT_SOCKET_TIMEOUT),
+        read_timeout=min(timeout, DEFAULT_SOCKET_TIMEOUT),
+        # One attempt per botocore call: throttles are retried by _call, under
+        # the quota scheduler, so botocore must not retry them underneath
+        retries={"mode": "standard", "total_max_attempts": 1},
+    )
+    return boto3.client(
+        "cognito-idp",
+        region_name=settings.aws_region,
+        endpoint_url=settings.cognito_endpoint_url or None,
+        config=config,
+    )
+
+
+@lru_cache
+def get_cognito_client() -> Any:
+    """Process-wide boto3 Cognito client (singleton, thread-safe once built)."""
+    return create_cognito_client(get_settings())
+
+
+@lru_cache
+def get_cognito_metrics() -> CognitoMetrics:
+    """Process-wide Cognito call counters (singleton)."""
+    return CognitoMetrics()
+
+
+@lru_cache
+def get_known_user_cache() -> TTLCache:
+    """Process-wide cache of usernames confirmed to exist in Cognito (singleton)."""
+    return TTLCache(max_entries=get_settings().cognito_known_user_cache_max_entries)
+
+
+@lru_cache
+def get_cognito_scheduler() -> QuotaScheduler:
+    """Process-wide Cognito quota scheduler (singleton)."""
+    settings = get_settings()
+    return QuotaScheduler(settings.cognito_quotas, settings.cognito_quota_max_wait)
+
+
+@lru_cache
+def get_cognito_breaker() -> CircuitBreaker:
+    """Process-wide circuit breaker for Cognito calls (singleton)."""
+    return CircuitBreaker.from_settings("cognito", get_settings())
+
+
+@lru_cache
+def get_cognito_executor() -> ThreadPoolExecutor:
+    """Process-wide thread pool for blocking boto3 Cognito calls (singleton)."""
+    return ThreadPoolExecutor(
+        max_workers=get_settings().cognito_max_workers,
+        thread_name_prefix="cognito",
+    )
 
 
 def get_cognito_provider(
     settings: Annotated[Settings, Depends(get_settings)],
 ) -> CognitoProvider:
     """Dependency for Cognito provider."""
-    return CognitoProvider(settings)
+    return CognitoProvider(
+        settings,
+        get_cognito_executor(),
+        get_cognito_client(),
+        get_cognito_metrics(),
+        get_known_user_cache(),
+        get_cognito_scheduler(),
+        get_cognito_breaker(),
+    )
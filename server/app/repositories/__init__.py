@@ -2,9 +2,22 @@
 Data access repositories.
 """
 
-from app.repositories.user_repository import UserRepository, get_user_repository
+from app.repositories.sqlite_user_repository import (
+    SQLiteUserRepository,
+    get_sqlite_user_repository,
+)
+from app.repositories.user_repository import (
+    UserRepository,
+    UserRepositoryProtocol,
+    get_json_user_repository,
+    get_user_repository,
+)
 
 __all__ = [
+    "SQLiteUserRepository",
     "UserRepository",
+    "UserRepositoryProtocol",
+    "get_json_user_repository",
+    "get_sqlite_user_repository",
     "get_user_repository",
 ]
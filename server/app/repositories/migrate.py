@@ -0,0 +1,54 @@
+"""
+Copy users from the JSON store into the SQLite store.
+
+Run from the server directory (safe to re-run; existing users are kept):
+    python -m app.repositories.migrate
+    python -m app.repositories.migrate --source data --target users.db
+
+Then set ``USER_STORE=sqlite``.
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from pathlib import Path
+
+from app.core.config import get_settings
+from app.repositories.sqlite_user_repository import SQLiteUserRepository
+from app.repositories.user_repository import UserRepository
+
+logger = logging.getLogger(__name__)
+
+
+def migrate(source: Path, target: Path) -> int:
+    """Import the JSON store in ``source`` into the database at ``target``."""
+    # Snapshot plus append log, as the JSON repository replays them
+    users = asyncio.run(UserRepository(source).list_all())
+    repository = SQLiteUserRepository(target)
+    try:
+        return repository.import_users(users)
+    finally:
+        repository.close()
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--source", type=Path, default=settings.data_dir)
+    parser.add_argument("--target", type=Path, default=settings.sqlite_path)
+    args = parser.parse_args()
+
+    if not args.source.is_dir():
+        parser.error(f"{args.source} is not a directory")
+
+    start = time.perf_counter()
+    inserted = migrate(args.source, args.target)
+    print(
+        f"Imported {inserted} users from {args.source} into {args.target} "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+SQLite-backed user repository.
+
+Users live in one table keyed by ``user_id`` with an index on ``email``, so
+lookups are indexed instead of scanning the whole store. The database runs
+in WAL mode: readers don't block the writer or each other.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+from collections.abc import Callable
+from datetime import UTC, datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    email TEXT NOT NULL DEFAULT '',
+    name TEXT,
+    created_at TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS users_email ON users (email);
+"""
+
+COLUMNS = "user_id, email, name, created_at"
+
+
+class SQLiteUserRepository:
+    """
+    SQLite user repository.
+
+    Queries run in worker threads (``asyncio.to_thread``), each with its own
+    connection, so the event loop never waits on disk. ``get_or_create``
+    inserts with ``ON CONFLICT DO NOTHING``, so concurrent first requests
+    for the same user create exactly one record.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Durable at checkpoints; safe against corruption in WAL mode
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    async def _run(self, fn: Callable[[sqlite3.Connection], T], action: str) -> T:
+        """Run ``fn`` with a connection in a worker thread."""
+        try:
+            return await asyncio.to_thread(lambda: fn(self._connection()))
+        except sqlite3.Error as e:
+            logger.error(f"Failed to {action} user data: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to {action} user data",
+            )
+
+    @staticmethod
+    def _new_user(user_data: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "user_id": user_data["user_id"],
+            "email": user_data.get("email") or "",
+            "name": user_data.get("name"),
+            "created_at": datetime.now(UTC).isoformat(),
+        }
+
+    async def get_by_id(self, user_id: str) -> dict[str, Any] | None:
+        """Get user by ID."""
+
+        def query(conn: sqlite3.Connection) -> dict[str, Any] | None:
+            row = conn.execute(
+                f"SELECT {COLUMNS} FROM users WHERE user_id = ?", (user_id,)
+            ).fetchone()
+            return dict(row) if row else None
+
+        return await self._run(query, "load")
+
+    async def get_by_email(self, email: str) -> dict[str, Any] | None:
+        """Get user by email (the earliest created, if several share it)."""
+
+        def query(conn: sqlite3.Connection) -> dict[str, Any] | None:
+            row = conn.execute(
+                f"SELECT {COLUMNS} FROM users WHERE email = ? "
+                "ORDER BY created_at LIMIT 1",
+                (email,),
+            ).fetchone()
+            return dict(row) if row else None
+
+        return await self._run(query, "load")
+
+    async def create(self, user_data: dict[str, Any]) -> dict[str, Any]:
+        """Create a new user."""
+        user = self._new_user(user_data)
+
+        def insert(conn: sqlite3.Connection) -> None:
+            with conn:
+                conn.execute(
+                    f"INSERT INTO users ({COLUMNS}) "
+                    "VALUES (:user_id, :email, :name, :created_at)",
+                    user,
+                )
+
+        await self._run(insert, "save")
+        return user
+
+    async def get_or_create(
+        self, user_data: dict[str, Any]
+    ) -> tuple[dict[str, Any], bool]:
+        """
+        Get the user with ``user_data["user_id"]``, creating it if missing.
+
+        Returns ``(user, created)``. Atomic: of several concurrent callers
+        for a new user, exactly one creates it and all get the same record.
+        """
+        user = self._new_user(user_data)
+
+        def upsert(conn: sqlite3.Connection) -> tuple[dict[str, Any], bool]:
+            with conn:
+                created = (
+                    conn.execute(
+                        f"INSERT INTO users ({COLUMNS}) "
+                        "VALUES (:user_id, :email, :name, :created_at) "
+                        "ON CONFLICT (user_id) DO NOTHING",
+                        user,
+                    ).rowcount
+                    == 1
+                )
+                if created:
+                    return user, True
+                row = conn.execute(
+                    f"SELECT {COLUMNS} FROM users WHERE user_id = ?",
+                    (user["user_id"],),
+                ).fetchone()
+                return dict(row), False
+
+        return await self._run(upsert, "save")
+
+    async def list_all(self) -> list[dict[str, Any]]:
+        """List all users, oldest first."""
+
+        def query(conn: sqlite3.Connection) -> list[dict[str, Any]]:
+            rows = conn.execute(
+                f"SELECT {COLUMNS} FROM users ORDER BY created_at, user_id"
+            ).fetchall()
+            return [dict(row) for row in rows]
+
+        return await self._run(query, "load")
+
+    async def list_page(
+        self, limit: int, after: str | None = None
+    ) -> list[dict[str, Any]]:
+        """Up to ``limit`` users ordered by user ID, starting after ``after``."""
+
+        def query(conn: sqlite3.Connection) -> list[dict[str, Any]]:
+            # Keyset pagination: a range scan of the primary key, no OFFSET
+            rows = conn.execute(
+                f"SELECT {COLUMNS} FROM users WHERE user_id > ? "
+                "ORDER BY user_id LIMIT ?",
+                (after or "", limit),
+            ).fetchall()
+            return [dict(row) for row in rows]
+
+        return await self._run(query, "load")
+
+    def import_users(self, users: list[dict[str, Any]]) -> int:
+        """
+        Insert users in one transaction, keeping their ``created_at`` and
+        skipping IDs already present. Returns how many were inserted.
+        """
+        conn = self._connection()
+        before = conn.total_changes
+        with conn:
+            conn.executemany(
+                f"INSERT INTO users ({COLUMNS}) "
+                "VALUES (:user_id, :email, :name, :created_at) "
+                "ON CONFLICT (user_id) DO NOTHING",
+                (
+                    {
+                        "user_id": user["user_id"],
+                        "email": user.get("email") or "",
+                        "name": user.get("name"),
+                        "created_at": user.get("created_at")
+                        or datetime.now(UTC).isoformat(),
+                    }
+                    for user in users
+                ),
+            )
+        return conn.total_changes - before
+
+    def close(self) -> None:
+        """Close every thread's connection."""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+@lru_cache
+def get_sqlite_user_repository() -> SQLiteUserRepository:
+    """Shared SQLite repository (one connection per worker thread)."""
+    settings = get_settings()
+    return SQLiteUserRepository(settings.sqlite_path)
@@ -1,24 +1,41 @@
 """
 User repository for data persistence.
 
-Currently uses JSON file storage, but can be swapped for a database.
+Uses JSON file storage by default; set ``USER_STORE=sqlite`` to use the
+SQLite repository instead.
 """
 
+import asyncio
+import bisect
+import contextlib
 import json
 import logging
-from datetime import datetime, timezone
+import os
+from datetime import UTC, datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Annotated, Protocol
+from typing import Annotated, Any, Protocol
 
 import aiofiles
 import aiofiles.os
 from fastapi import Depends, HTTPException, status
 
+from app.core.batching import GroupCommitter
 from app.core.config import Settings, get_settings
+from app.repositories.sqlite_user_repository import get_sqlite_user_repository
 
 logger = logging.getLogger(__name__)
 
 
+def _fsync_dir(path: Path) -> None:
+    """Sync a directory so a rename inside it survives a crash."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
 class UserRepositoryProtocol(Protocol):
     """Protocol defining the user repository interface."""
 
@@ -34,10 +51,22 @@ class UserRepositoryProtocol(Protocol):
         """Create a new user."""
         ...
 
+    async def get_or_create(
+        self, user_data: dict[str, Any]
+    ) -> tuple[dict[str, Any], bool]:
+        """Get user by ID or create it from ``user_data``; returns (user, created)."""
+        ...
+
     async def list_all(self) -> list[dict]:
         """List all users."""
         ...
 
+    async def list_page(
+        self, limit: int, after: str | None = None
+    ) -> list[dict[str, Any]]:
+        """Up to ``limit`` users ordered by user ID, starting after ``after``."""
+        ...
+
 
 class UserRepository:
     """
@@ -45,77 +74,357 @@ class UserRepository:
 
     Stores users in a JSON file. For production, replace with
     a database-backed implementation (PostgreSQL, DynamoDB, etc.).
+
+    Storage is a snapshot (``users.json``) plus an append-only log
+    (``users.log.jsonl``, one user record per line). Creates append one
+    line; a record for an existing ``user_id`` replaces it on replay. The
+    background compactor folds the log into a new snapshot (temp file +
+    rename) and drops the folded lines. Replay is idempotent, so a crash
+    between the two steps loses nothing.
+
+    Keeps the replayed state in memory indexed by user ID and email,
+    reloaded only when either file's mtime or size changes, so lookups are
+    dict hits. Returned dicts are shared with the cache and must not be
+    mutated.
+
+    Creates go through a single-writer group commit: creates arriving while
+    a write is in progress (or within ``write_batch_delay``), up to
+    ``write_batch_size``, share the next log append and fsync, and each
+    caller returns once its own record is on disk.
     """
 
-    def __init__(self, data_dir: Path):
+    def __init__(
+        self,
+        data_dir: Path,
+        compact_interval: float = 300.0,
+        compact_min_records: int = 1000,
+        write_batch_size: int = 100,
+        write_batch_delay: float = 0.0,
+    ):
         self.users_file = data_dir / "users.json"
+        self.log_file = data_dir / "users.log.jsonl"
+        self.compact_interval = compact_interval
+        self.compact_min_records = compact_min_records
+
+        self._users: list[dict[str, Any]] = []
+        self._by_id: dict[str, dict[str, Any]] = {}
+        self._by_email: dict[str, dict[str, Any]] = {}
+        self._sorted_ids: list[str] | None = None  # For pages; built on demand
+        self._log_records = 0  # Records in the log not yet in the snapshot
+        self._log_torn = False  # Log ends mid-line (crash during an append)
+        # (mtime_ns, size) of the snapshot and the log as last loaded
+        self._stamp: tuple[tuple[int, int] | None, ...] | None = None
+        self._write_lock = asyncio.Lock()
+        self._compact_task: asyncio.Task[None] | None = None
+        self.writer = GroupCommitter(self._commit, write_batch_size, write_batch_delay)
+
+    @staticmethod
+    def _stat(path: Path) -> tuple[int, int] | None:
+        # A plain stat is cheaper than handing it to a thread
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _file_stamp(self) -> tuple[tuple[int, int] | None, ...]:
+        return self._stat(self.users_file), self._stat(self.log_file)
+
+    async def load(self) -> None:
+        """Replay the snapshot and log into memory (call at startup)."""
+        await self._refresh()
+        logger.info(
+            f"Loaded {len(self._users)} users ({self._log_records} from the append log)"
+        )
+
+    async def _refresh(self) -> None:
+        """Reload the in-memory state if either file changed since it was read."""
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return
+        users = {user["user_id"]: user for user in await self._load()}
+        records = await self._replay_log()
+        for user in records:
+            users[user["user_id"]] = user
+        self._index(list(users.values()))
+        self._log_records = len(records)
+        self._stamp = stamp
+
+    def _index(self, users: list[dict[str, Any]]) -> None:
+        self._users = users
+        self._by_id = {}
+        self._by_email = {}
+        self._sorted_ids = None
+        for user in users:
+            self._add_to_index(user)
+
+    def _add_to_index(self, user: dict[str, Any]) -> None:
+        """
+        Index a new record, or the record that replaces one for its user ID.
+
+        An email maps to the first user in ``_users`` with that email, as with
+        a scan of the file; users without one are not indexed by email.
+        """
+        previous = self._by_id.get(user["user_id"])
+        self._by_id[user["user_id"]] = user
+        email = user.get("email")
+        if previous is None:
+            if email:
+                self._by_email.setdefault(email, user)
+        elif previous.get("email") == email:
+            if email and self._by_email.get(email) is previous:
+                self._by_email[email] = user
+        else:
+            # The email changed: rare enough to rebuild the email index
+            self._index_emails()
+
+    def _index_emails(self) -> None:
+        self._by_email = {}
+        for user in self._users:
+            email = user.get("email")
+            # Skip records replaced by a later one for the same user ID
+            if email and self._by_id.get(user["user_id"]) is user:
+                self._by_email.setdefault(email, user)
 
     async def _load(self) -> list[dict]:
-        """Load users from JSON file."""
+        """Load users from the JSON snapshot."""
         if not await aiofiles.os.path.exists(self.users_file):
             return []
 
         try:
-            async with aiofiles.open(self.users_file, "r") as f:
+            async with aiofiles.open(self.users_file) as f:
                 content = await f.read()
                 return json.loads(content) if content else []
-        except (json.JSONDecodeError, IOError) as e:
+        except (OSError, json.JSONDecodeError) as e:
             logger.error(f"Failed to load users file: {e}")
             return []
 
-    async def _save(self, users: list[dict]) -> None:
-        """Save users to JSON file."""
+    async def _replay_log(self) -> list[dict[str, Any]]:
+        """Read the records appended since the last compaction."""
+        try:
+            async with aiofiles.open(self.log_file) as f:
+                content = await f.read()
+        except FileNotFoundError:
+            return []
+        except OSError as e:
+            logger.error(f"Failed to read users log: {e}")
+            return []
+
+        # Terminate a torn final line before appending after it
+        self._log_torn = bool(content) and not content.endswith("\n")
+        records = []
+        for number, line in enumerate(content.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                # A torn final line from a crash mid-append
+                logger.warning(f"Skipping unreadable users log line {number}")
+        return records
+
+    async def _append(self, users: list[dict[str, Any]]) -> None:
+        """Append records to the log in one write, synced to disk."""
         try:
             # Ensure directory exists
-            self.users_file.parent.mkdir(parents=True, exist_ok=True)
+            self.log_file.parent.mkdir(parents=True, exist_ok=True)
 
-            async with aiofiles.open(self.users_file, "w") as f:
-                await f.write(json.dumps(users, indent=2))
-        except IOError as e:
-            logger.error(f"Failed to save users file: {e}")
+            lines = "".join(json.dumps(user) + "\n" for user in users)
+            async with aiofiles.open(self.log_file, "a") as f:
+                await f.write("\n" + lines if self._log_torn else lines)
+                await f.flush()
+                await asyncio.to_thread(os.fsync, f.fileno())
+            self._log_torn = False
+        except OSError as e:
+            logger.error(f"Failed to append to users log: {e}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to save user data",
             )
 
+    async def _save(self, users: list[dict]) -> None:
+        """Save a snapshot atomically (temp file + fsync + rename)."""
+        tmp_path = self.users_file.with_suffix(".json.tmp")
+        self.users_file.parent.mkdir(parents=True, exist_ok=True)
+        async with aiofiles.open(tmp_path, "w") as f:
+            await f.write(json.dumps(users, indent=2))
+            await f.flush()
+            await asyncio.to_thread(os.fsync, f.fileno())
+        await aiofiles.os.replace(tmp_path, self.users_file)
+        await asyncio.to_thread(_fsync_dir, self.users_file.parent)
+
     async def get_by_id(self, user_id: str) -> dict | None:
         """Get user by ID."""
-        users = await self._load()
-        for user in users:
-            if user["user_id"] == user_id:
-                return user
-        return None
+        await self._refresh()
+        return self._by_id.get(user_id)
 
     async def get_by_email(self, email: str) -> dict | None:
         """Get user by email."""
-        users = await self._load()
-        for user in users:
-            if user.get("email") == email:
-                return user
-        return None
+        await self._refresh()
+        return self._by_email.get(email)
 
     async def create(self, user_data: dict) -> dict:
         """Create a new user."""
-        users = await self._load()
+        result: tuple[dict[str, Any], bool] = await self.writer.submit(
+            (user_data, False)
+        )
+        return result[0]
+
+    async def get_or_create(
+        self, user_data: dict[str, Any]
+    ) -> tuple[dict[str, Any], bool]:
+        """Get user by ID, creating it if missing."""
+        user = await self.get_by_id(user_data["user_id"])
+        if user:
+            return user, False
+        result: tuple[dict[str, Any], bool] = await self.writer.submit(
+            (user_data, True)
+        )
+        return result
+
+    async def _commit(
+        self, batch: list[tuple[dict[str, Any], bool]]
+    ) -> list[tuple[dict[str, Any], bool]]:
+        """
+        Write a batch of creates as one log append. Items are
+        ``(user_data, only_if_missing)``; returns ``(user, created)`` each.
+        """
+        async with self._write_lock:
+            await self._refresh()
+
+            created_at = datetime.now(UTC).isoformat()
+            results: list[tuple[dict[str, Any], bool]] = []
+            new_users: dict[str, dict[str, Any]] = {}
+            for user_data, only_if_missing in batch:
+                user_id = user_data["user_id"]
+                # Another request may have created it since it was looked up
+                existing = new_users.get(user_id) or self._by_id.get(user_id)
+                if only_if_missing and existing:
+                    results.append((existing, False))
+                    continue
 
-        # Add timestamp
-        user = {
-            **user_data,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-        }
+                # Add timestamp
+                user = {**user_data, "created_at": created_at}
+                new_users[user_id] = user
+                results.append((user, True))
 
-        users.append(user)
-        await self._save(users)
+            if new_users:
+                await self._append(list(new_users.values()))
+                for user_id, user in new_users.items():
+                    previous = self._by_id.get(user_id)
+                    if previous is None:
+                        if self._sorted_ids is not None:
+                            bisect.insort(self._sorted_ids, user_id)
+                        self._users.append(user)
+                    else:
+                        # Replaces the existing record in place, as on replay
+                        index = next(
+                            i for i, u in enumerate(self._users) if u is previous
+                        )
+                        self._users[index] = user
+                    self._add_to_index(user)
+                self._log_records += len(new_users)
+                self._stamp = self._file_stamp()
 
-        return user
+            return results
 
     async def list_all(self) -> list[dict]:
         """List all users."""
-        return await self._load()
+        await self._refresh()
+        return list(self._users)
+
+    async def list_page(
+        self, limit: int, after: str | None = None
+    ) -> list[dict[str, Any]]:
+        """Up to ``limit`` users ordered by user ID, starting after ``after``."""
+        await self._refresh()
+        if self._sorted_ids is None:
+            self._sorted_ids = sorted(self._by_id)
+        start = bisect.bisect_right(self._sorted_ids, after) if after else 0
+        return [self._by_id[i] for i in self._sorted_ids[start : start + limit]]
+
+    async def compact(self) -> bool:
+        """
+        Fold the log into a new snapshot. Creates continue meanwhile; only
+        the log lines the snapshot covers are dropped. Returns False if
+        there was nothing to fold or the snapshot could not be written.
+        """
+        async with self._write_lock:
+            await self._refresh()
+            users = list(self._users)
+            folded = self._log_records
+            offset = (self._stat(self.log_file) or (0, 0))[1]
+        if not folded:
+            return False
+
+        try:
+            await self._save(users)
+        except OSError as e:
+            logger.error(f"Failed to compact users log: {e}")
+            return False
+
+        async with self._write_lock:
+            try:
+                await self._drop_log_head(offset)
+            except OSError as e:
+                # Harmless: replaying folded records again is idempotent
+                logger.warning(f"Failed to trim users log: {e}")
+            self._log_records -= folded
+            self._stamp = self._file_stamp()
+        logger.info(f"Compacted {folded} log records into {len(users)} users")
+        return True
+
+    async def _drop_log_head(self, offset: int) -> None:
+        """Replace the log with what was appended after ``offset`` bytes."""
+        async with aiofiles.open(self.log_file, "rb") as f:
+            await f.seek(offset)
+            tail = await f.read()
+        tmp_path = self.log_file.with_suffix(".jsonl.tmp")
+        async with aiofiles.open(tmp_path, "wb") as f:
+            await f.write(tail)
+            await f.flush()
+            await asyncio.to_thread(os.fsync, f.fileno())
+        await aiofiles.os.replace(tmp_path, self.log_file)
+        await asyncio.to_thread(_fsync_dir, self.log_file.parent)
+
+    async def start(self) -> None:
+        """Start background compaction."""
+        if self._compact_task is None:
+            self._compact_task = asyncio.create_task(self._compact_loop())
+
+    async def stop(self) -> None:
+        """Stop background compaction and the writer."""
+        await self.writer.close()
+        if self._compact_task is not None:
+            self._compact_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._compact_task
+            self._compact_task = None
+
+    async def _compact_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.compact_interval)
+            if self._log_records >= self.compact_min_records:
+                await self.compact()
+
+
+@lru_cache
+def get_json_user_repository() -> UserRepository:
+    """Shared JSON repository, so its in-memory state outlives requests."""
+    settings = get_settings()
+    return UserRepository(
+        settings.data_dir,
+        compact_interval=settings.user_log_compact_interval,
+        compact_min_records=settings.user_log_compact_min_records,
+        write_batch_size=settings.user_write_batch_size,
+        write_batch_delay=settings.user_write_batch_delay,
+    )
 
 
 def get_user_repository(
     settings: Annotated[Settings, Depends(get_settings)],
-) -> UserRepository:
-    """Dependency for user repository."""
-    return UserRepository(settings.data_dir)
+) -> UserRepositoryProtocol:
+    """Dependency for user repository (JSON file or SQLite, per settings)."""
+    if settings.user_store == "sqlite":
+        return get_sqlite_user_repository()
+    return get_json_user_repository()
@@ -6,6 +6,10 @@ from app.schemas.auth import (
     AppleAuthRequest,
     AuthTokenResponse,
     GoogleAuthRequest,
+    RefreshTokenRequest,
+    TokenIntrospectionRequest,
+    TokenIntrospectionResponse,
+    TokenIntrospectionResult,
 )
 from app.schemas.common import ErrorDetail, ErrorResponse, HealthResponse
 from app.schemas.messages import MessageResponse
@@ -16,6 +20,10 @@ __all__ = [
     "AppleAuthRequest",
     "GoogleAuthRequest",
     "AuthTokenResponse",
+    "RefreshTokenRequest",
+    "TokenIntrospectionRequest",
+    "TokenIntrospectionResponse",
+    "TokenIntrospectionResult",
     # Users
     "UserResponse",
     "UserCreate",
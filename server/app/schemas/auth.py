@@ -2,7 +2,9 @@
 Authentication-related schemas.
 """
 
-from pydantic import BaseModel
+from typing import Any
+
+from pydantic import BaseModel, Field
 
 
 class AppleAuthRequest(BaseModel):
@@ -22,6 +24,12 @@ class GoogleAuthRequest(BaseModel):
     full_name: str | None = None
 
 
+class RefreshTokenRequest(BaseModel):
+    """Request to exchange a Cognito refresh token for new tokens."""
+
+    refresh_token: str = Field(min_length=1)
+
+
 class AuthTokenResponse(BaseModel):
     """Response containing authentication tokens."""
 
@@ -29,3 +37,23 @@ class AuthTokenResponse(BaseModel):
     access_token: str
     refresh_token: str | None = None
     expires_in: int
+
+
+class TokenIntrospectionRequest(BaseModel):
+    """Request to validate a batch of Cognito/Google tokens."""
+
+    tokens: list[str] = Field(min_length=1, max_length=100)
+
+
+class TokenIntrospectionResult(BaseModel):
+    """Validation outcome for a single token."""
+
+    active: bool
+    claims: dict[str, Any] | None = None
+    error: str | None = None
+
+
+class TokenIntrospectionResponse(BaseModel):
+    """Per-token results, in request order."""
+
+    results: list[TokenIntrospectionResult]
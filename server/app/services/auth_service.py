@@ -7,19 +7,32 @@ from typing import Annotated
 
 from fastapi import Depends, HTTPException, status
 
+from app.core.singleflight import SingleFlight
 from app.providers.apple import AppleProvider, get_apple_provider
 from app.providers.cognito import CognitoProvider, get_cognito_provider
 from app.providers.google import GoogleProvider, get_google_provider
-from app.schemas.auth import AppleAuthRequest, AuthTokenResponse, GoogleAuthRequest
+from app.schemas.auth import (
+    AppleAuthRequest,
+    AuthTokenResponse,
+    GoogleAuthRequest,
+    RefreshTokenRequest,
+)
 
 logger = logging.getLogger(__name__)
 
+# In-flight Cognito sign-ins by email, shared by every AuthService in the process
+_sign_ins = SingleFlight()
+
 
 class AuthService:
     """
     Service for authentication operations.
 
     Handles token exchange flows for native social sign-in (Apple/Google).
+
+    Concurrent exchanges for the same email (two devices, client retries)
+    share one Cognito sign-in: one user creation, one password set and one
+    token pair, instead of racing each other.
     """
 
     def __init__(
@@ -32,6 +45,24 @@ class AuthService:
         self.apple = apple
         self.google = google
 
+    async def _sign_in(self, email: str | None, name: str | None) -> AuthTokenResponse:
+        """
+        Cognito sign-in, coalesced with any in-flight sign-in for the email.
+
+        Sign-ins are keyed on the normalized (stripped, lower-cased) email, so
+        ``Jane@Example.com`` and ``jane@example.com`` share one. The first
+        caller's email and name are used: ``name`` only matters when the
+        sign-in creates the user, and a different name sent by a caller that
+        joins an in-flight sign-in is ignored.
+        """
+        if not email:
+            return await self.cognito.sign_in(email=email, name=name)
+        tokens: AuthTokenResponse = await _sign_ins.do(
+            email.strip().lower(),
+            lambda: self.cognito.sign_in(email=email, name=name),
+        )
+        return tokens
+
     async def exchange_apple_token(
         self, request: AppleAuthRequest
     ) -> AuthTokenResponse:
@@ -45,7 +76,7 @@ class AuthService:
         4. Generate Cognito tokens for the user
         """
         # Verify Apple token
-        claims = self.apple.verify_token(request.identity_token)
+        claims = await self.apple.verify_token(request.identity_token)
 
         apple_sub = claims.get("sub")
         if not apple_sub:
@@ -57,16 +88,10 @@ class AuthService:
         # Email from request or token (may not be present after first sign-in)
         email = request.email or claims.get("email")
 
-        # Get or create Cognito user
-        username = self.cognito.get_or_create_user(
-            email=email,
-            name=request.full_name,
-        )
-
-        # Generate Cognito tokens
-        tokens = self.cognito.initiate_auth(username)
+        # Create the Cognito user if needed and generate Cognito tokens
+        tokens = await self._sign_in(email, request.full_name)
 
-        logger.info(f"Apple sign-in successful for user: {username}")
+        logger.info(f"Apple sign-in successful for user: {email}")
         return tokens
 
     async def exchange_google_token(
@@ -82,7 +107,7 @@ class AuthService:
         4. Generate Cognito tokens for the user
         """
         # Verify Google token
-        claims = self.google.verify_token(request.id_token)
+        claims = await self.google.verify_token(request.id_token)
 
         google_sub = claims.get("sub")
         if not google_sub:
@@ -95,18 +120,21 @@ class AuthService:
         email = request.email or claims.get("email")
         full_name = request.full_name or claims.get("name")
 
-        # Get or create Cognito user
-        username = self.cognito.get_or_create_user(
-            email=email,
-            name=full_name,
-        )
-
-        # Generate Cognito tokens
-        tokens = self.cognito.initiate_auth(username)
+        # Create the Cognito user if needed and generate Cognito tokens
+        tokens = await self._sign_in(email, full_name)
 
-        logger.info(f"Google sign-in successful for user: {username}")
+        logger.info(f"Google sign-in successful for user: {email}")
         return tokens
 
+    async def refresh_tokens(self, request: RefreshTokenRequest) -> AuthTokenResponse:
+        """
+        Exchange a Cognito refresh token for new tokens.
+
+        Lets clients renew expired ID/access tokens with a single Cognito
+        call instead of redoing the full social sign-in exchange.
+        """
+        return await self.cognito.refresh_tokens(request.refresh_token)
+
 
 def get_auth_service(
     cognito: Annotated[CognitoProvider, Depends(get_cognito_provider)],
@@ -2,110 +2,359 @@
 JWKS (JSON Web Key Set) service for fetching and caching public keys.
 """
 
+import asyncio
+import contextlib
+import json
 import logging
+import time
+from dataclasses import dataclass, field
 from functools import lru_cache
-from typing import Annotated
+from pathlib import Path
+from typing import Any
 
+import aiofiles
+import aiofiles.os
 import httpx
-from fastapi import Depends, HTTPException, status
+from fastapi import HTTPException, status
+from jose import jwk
+from jose.backends.base import Key
+from jose.exceptions import JOSEError
 
+from app.core.cache import TTLCache
+from app.core.circuit import CircuitBreaker, CircuitOpenError
 from app.core.config import Settings, get_settings
+from app.core.deadline import timeout_for
+from app.core.exceptions import DeadlineExceededError, ExternalServiceError
+from app.core.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class KeySet:
+    """Last good key set for one issuer."""
+
+    name: str
+    url: str
+    service: str  # Human-readable name used in "<service> unavailable" errors
+    keys: dict[str, Key] = field(default_factory=dict)
+    refreshed_at: float | None = None  # time.monotonic() of last good refresh
+    from_snapshot: bool = False  # Loaded from disk, not yet confirmed live
+
+    @property
+    def loaded(self) -> bool:
+        return self.refreshed_at is not None
+
+    @property
+    def age(self) -> float:
+        """Seconds since the last good refresh (infinite if never loaded)."""
+        if self.refreshed_at is None:
+            return float("inf")
+        return time.monotonic() - self.refreshed_at
+
+
 class JWKSService:
     """
     Service for fetching and caching JWKS from identity providers.
 
-    Uses LRU cache to minimize network requests while supporting
-    cache invalidation for key rotation scenarios.
+    Key sets are fetched with a shared ``httpx.AsyncClient`` and refreshed on
+    a background schedule. Lookups always read the last good key set, so a
+    refresh in flight (or a failed one) never blocks token verification.
+    Each fetched JWKS is indexed once into a ``kid -> Key`` mapping so the
+    request path never constructs or PEM-encodes keys.
+
+    Unknown key IDs trigger at most one coalesced refetch per issuer, no more
+    often than ``jwks_min_refresh_interval``, and kids still missing afterwards
+    are remembered for ``jwks_unknown_kid_ttl`` seconds. A burst of tokens
+    with forged or stale kids therefore cannot amplify into outbound fetches.
+
+    Every good key set is also persisted under ``data_dir/jwks``. At startup
+    those snapshots are served (up to ``jwks_snapshot_max_age`` old) until a
+    live refresh succeeds, so cold starts don't wait on the providers and a
+    brief provider outage doesn't turn into 503s.
+
+    Each JWKS endpoint has its own circuit breaker. While it is open,
+    fetches fail fast with ``ExternalServiceError`` and the last good key
+    set keeps serving.
     """
 
+    COGNITO = "cognito"
+    APPLE = "apple"
+    GOOGLE = "google"
+
     APPLE_JWKS_URL = "https://appleid.apple.com/auth/keys"
     GOOGLE_JWKS_URL = "https://www.googleapis.com/oauth2/v3/certs"
     TIMEOUT = 10.0
+    UNKNOWN_KID_CACHE_SIZE = 10_000
 
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, client: httpx.AsyncClient | None = None):
         self.settings = settings
+        self._client = client
+        self.snapshot_dir: Path = settings.data_dir / "jwks"
+        self._refresh_task: asyncio.Task[None] | None = None
+        self._single_flight = SingleFlight()
+        self.unknown_kids = TTLCache(max_entries=self.UNKNOWN_KID_CACHE_SIZE)
+        self.key_sets: dict[str, KeySet] = {
+            self.COGNITO: KeySet(
+                self.COGNITO,
+                settings.cognito_jwks_url,
+                "Authentication service",
+            ),
+            self.APPLE: KeySet(
+                self.APPLE,
+                self.APPLE_JWKS_URL,
+                "Apple authentication service",
+            ),
+            self.GOOGLE: KeySet(
+                self.GOOGLE,
+                self.GOOGLE_JWKS_URL,
+                "Google authentication service",
+            ),
+        }
+        self.breakers: dict[str, CircuitBreaker] = {
+            name: CircuitBreaker.from_settings(f"jwks_{name}", settings)
+            for name in self.key_sets
+        }
 
-    @staticmethod
-    @lru_cache(maxsize=1)
-    def _fetch_cognito_jwks(jwks_url: str) -> dict:
-        """Fetch Cognito JWKS (cached)."""
-        try:
-            response = httpx.get(jwks_url, timeout=JWKSService.TIMEOUT)
-            response.raise_for_status()
-            return response.json()
-        except httpx.RequestError as e:
-            logger.error(f"Failed to fetch Cognito JWKS: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Authentication service unavailable",
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Lazy initialization of the shared HTTP client."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.TIMEOUT)
+        return self._client
+
+    def _configured_issuers(self) -> list[str]:
+        """Issuers worth preloading given the current settings."""
+        issuers = []
+        if self.settings.cognito_user_pool_id:
+            issuers.append(self.COGNITO)
+        if self.settings.apple_bundle_id:
+            issuers.append(self.APPLE)
+        if self.settings.google_client_id:
+            issuers.append(self.GOOGLE)
+        return issuers
+
+    async def start(self) -> None:
+        """
+        Preload configured key sets and start the background refresher.
+
+        Issuers already served from a snapshot are refreshed in the
+        background instead of delaying startup.
+        """
+        await asyncio.gather(
+            *(
+                self._refresh_quietly(issuer)
+                for issuer in self._configured_issuers()
+                if not self.key_sets[issuer].loaded
             )
+        )
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        """Stop the background refresher and close the HTTP client."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._refresh_task
+            self._refresh_task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _refresh_loop(self) -> None:
+        """Periodically refresh every configured or previously used key set."""
+        await asyncio.gather(
+            *(
+                self._refresh_quietly(name)
+                for name, ks in self.key_sets.items()
+                if ks.from_snapshot
+            )
+        )
+        while True:
+            await asyncio.sleep(self.settings.jwks_refresh_interval)
+            issuers = set(self._configured_issuers())
+            issuers.update(name for name, ks in self.key_sets.items() if ks.loaded)
+            await asyncio.gather(*(self._refresh_quietly(i) for i in issuers))
 
     @staticmethod
-    @lru_cache(maxsize=1)
-    def _fetch_apple_jwks() -> dict:
-        """Fetch Apple JWKS (cached)."""
+    def _build_key_index(jwks: dict[str, Any]) -> dict[str, Key]:
+        """Construct a verification key for every JWK in the set, by key ID."""
+        index: dict[str, Key] = {}
+        for key_data in jwks.get("keys", []):
+            kid = key_data.get("kid")
+            if not kid:
+                continue
+            try:
+                index[kid] = jwk.construct(key_data, key_data.get("alg", "RS256"))
+            except JOSEError as e:
+                logger.warning(f"Skipping unusable JWK {kid}: {e}")
+        return index
+
+    async def refresh(self, issuer: str) -> None:
+        """
+        Fetch an issuer's JWKS and swap in the new key index.
+
+        Concurrent refreshes of the same issuer share one fetch. The previous
+        key set keeps serving lookups until the swap. Raises 503 if the fetch
+        fails, or ``ExternalServiceError`` if the endpoint's breaker is open.
+
+        Inside a request, waits at most the remaining deadline budget and
+        raises ``DeadlineExceededError`` after that; the shared fetch itself
+        carries on for other waiters.
+        """
+        service = self.key_sets[issuer].service
         try:
-            response = httpx.get(
-                JWKSService.APPLE_JWKS_URL, timeout=JWKSService.TIMEOUT
+            await asyncio.wait_for(
+                self._single_flight.do(issuer, lambda: self._fetch(issuer)),
+                timeout=timeout_for(service),
             )
+        except TimeoutError:
+            logger.warning(f"{service} JWKS fetch exceeded the request deadline")
+            raise DeadlineExceededError(service)
+
+    async def _fetch(self, issuer: str) -> None:
+        """
+        Fetch and index an issuer's JWKS.
+
+        The HTTP request is bounded by the initiating caller's remaining
+        budget (the task inherits its deadline), so a request whose waiters
+        have all given up is cancelled rather than left holding a connection.
+        """
+        key_set = self.key_sets[issuer]
+        breaker = self.breakers[issuer]
+        timeout = timeout_for(key_set.service, self.TIMEOUT)
+        try:
+            breaker.allow()
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping {issuer} JWKS fetch: {e}")
+            raise ExternalServiceError(key_set.service)
+
+        start = time.monotonic()
+        try:
+            response = await self.client.get(key_set.url, timeout=timeout)
             response.raise_for_status()
-            return response.json()
-        except httpx.RequestError as e:
-            logger.error(f"Failed to fetch Apple JWKS: {e}")
+            jwks = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            breaker.record(time.monotonic() - start, failed=True)
+            logger.error(f"Failed to fetch {issuer} JWKS: {e}")
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Apple authentication service unavailable",
+                detail=f"{key_set.service} unavailable",
             )
+        breaker.record(time.monotonic() - start)
 
-    @staticmethod
-    @lru_cache(maxsize=1)
-    def _fetch_google_jwks() -> dict:
-        """Fetch Google JWKS (cached)."""
+        key_set.keys = self._build_key_index(jwks)
+        key_set.refreshed_at = time.monotonic()
+        key_set.from_snapshot = False
+        logger.info(f"Refreshed {issuer} JWKS ({len(key_set.keys)} keys)")
+
+        await self._save_snapshot(issuer, jwks)
+
+    def _snapshot_path(self, issuer: str) -> Path:
+        return self.snapshot_dir / f"{issuer}.json"
+
+    async def _save_snapshot(self, issuer: str, jwks: dict[str, Any]) -> None:
+        """Persist a good JWKS atomically (temp file + rename)."""
+        path = self._snapshot_path(issuer)
+        tmp_path = path.with_suffix(".json.tmp")
         try:
-            response = httpx.get(
-                JWKSService.GOOGLE_JWKS_URL, timeout=JWKSService.TIMEOUT
-            )
-            response.raise_for_status()
-            return response.json()
-        except httpx.RequestError as e:
-            logger.error(f"Failed to fetch Google JWKS: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Google authentication service unavailable",
+            await aiofiles.os.makedirs(self.snapshot_dir, exist_ok=True)
+            async with aiofiles.open(tmp_path, "w") as f:
+                await f.write(json.dumps({"fetched_at": time.time(), "jwks": jwks}))
+            await aiofiles.os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to save {issuer} JWKS snapshot: {e}")
+
+    async def load_snapshots(self) -> None:
+        """Serve persisted key sets that are younger than the snapshot age limit."""
+        for issuer, key_set in self.key_sets.items():
+            if key_set.loaded:
+                continue
+
+            path = self._snapshot_path(issuer)
+            try:
+                async with aiofiles.open(path) as f:
+                    snapshot = json.loads(await f.read())
+                age = time.time() - float(snapshot["fetched_at"])
+                jwks = snapshot["jwks"]
+            except FileNotFoundError:
+                continue
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Ignoring unreadable {issuer} JWKS snapshot: {e}")
+                continue
+
+            if age > self.settings.jwks_snapshot_max_age:
+                logger.info(f"Ignoring {issuer} JWKS snapshot ({age:.0f}s old)")
+                continue
+
+            key_set.keys = self._build_key_index(jwks)
+            key_set.refreshed_at = time.monotonic() - max(age, 0.0)
+            key_set.from_snapshot = True
+            logger.info(
+                f"Loaded {issuer} JWKS snapshot ({len(key_set.keys)} keys, "
+                f"{age:.0f}s old)"
             )
 
-    def get_cognito_jwks(self) -> dict:
-        """Get Cognito JWKS (cached)."""
-        return self._fetch_cognito_jwks(self.settings.cognito_jwks_url)
+    async def _refresh_quietly(self, issuer: str) -> None:
+        """Refresh a key set, keeping the last good one on failure."""
+        with contextlib.suppress(
+            HTTPException, ExternalServiceError, DeadlineExceededError
+        ):
+            await self.refresh(issuer)
+
+    async def get_key(self, issuer: str, kid: str) -> Key | None:
+        """
+        Get the verification key for a key ID from an issuer's key set.
+
+        On a miss the key set is refetched once (key rotation case), subject
+        to the minimum refresh interval and the unknown-kid cache. Only kids
+        still missing after a refetch are cached as unknown.
+        """
+        key_set = self.key_sets[issuer]
+        if not key_set.loaded or (
+            key_set.from_snapshot and key_set.age > self.settings.jwks_snapshot_max_age
+        ):
+            await self.refresh(issuer)
 
-    def get_apple_jwks(self) -> dict:
-        """Get Apple JWKS (cached)."""
-        return self._fetch_apple_jwks()
+        key = key_set.keys.get(kid)
+        if key is not None:
+            return key
 
-    def get_google_jwks(self) -> dict:
-        """Get Google JWKS (cached)."""
-        return self._fetch_google_jwks()
+        if self.unknown_kids.get((issuer, kid)):
+            return None
 
-    def clear_cognito_cache(self) -> None:
-        """Clear Cognito JWKS cache (for key rotation)."""
-        self._fetch_cognito_jwks.cache_clear()
+        if (
+            key_set.age < self.settings.jwks_min_refresh_interval
+            and not self._single_flight.in_flight(issuer)
+        ):
+            # Rate-limited: don't remember the kid as unknown without having
+            # checked, or a forged kid could block a real key rotated in later
+            return None
+
+        await self.refresh(issuer)
+        key = key_set.keys.get(kid)
+        if key is None:
+            self.unknown_kids.set(
+                (issuer, kid),
+                True,
+                expires_at=time.time() + self.settings.jwks_unknown_kid_ttl,
+            )
+        return key
 
-    def clear_apple_cache(self) -> None:
-        """Clear Apple JWKS cache (for key rotation)."""
-        self._fetch_apple_jwks.cache_clear()
+    def breaker_states(self) -> dict[str, dict[str, Any]]:
+        """Circuit breaker stats per JWKS endpoint."""
+        return {breaker.name: breaker.stats() for breaker in self.breakers.values()}
 
-    def clear_google_cache(self) -> None:
-        """Clear Google JWKS cache (for key rotation)."""
-        self._fetch_google_jwks.cache_clear()
+    def refresh_ages(self) -> dict[str, float | None]:
+        """Seconds since each issuer's last successful refresh (None if never)."""
+        return {
+            name: round(ks.age, 1) if ks.loaded else None
+            for name, ks in self.key_sets.items()
+        }
 
 
 @lru_cache()
-def get_jwks_service(
-    settings: Annotated[Settings, Depends(get_settings)],
-) -> JWKSService:
+def get_jwks_service() -> JWKSService:
     """Dependency for JWKS service (singleton)."""
-    return JWKSService(settings)
+    return JWKSService(get_settings())
@@ -3,11 +3,15 @@ User service for user management operations.
 """
 
 import logging
+from collections.abc import AsyncIterator
 from typing import Annotated
 
 from fastapi import Depends, HTTPException, status
 
-from app.repositories.user_repository import UserRepository, get_user_repository
+from app.repositories.user_repository import (
+    UserRepositoryProtocol,
+    get_user_repository,
+)
 from app.schemas.users import UserResponse
 
 logger = logging.getLogger(__name__)
@@ -21,7 +25,7 @@ class UserService:
     persistence to the repository layer.
     """
 
-    def __init__(self, repository: UserRepository):
+    def __init__(self, repository: UserRepositoryProtocol):
         self.repository = repository
 
     async def get_or_create_from_claims(self, claims: dict) -> UserResponse:
@@ -50,10 +54,13 @@ class UserService:
             "name": claims.get("name"),
         }
 
-        new_user = await self.repository.create(user_data)
-        logger.info(f"Created new user: {user_id}")
+        # Atomic where the store supports it: concurrent first calls for the
+        # same user create one record
+        user, created = await self.repository.get_or_create(user_data)
+        if created:
+            logger.info(f"Created new user: {user_id}")
 
-        return UserResponse(**new_user)
+        return UserResponse(**user)
 
     async def get_user(self, user_id: str) -> UserResponse:
         """Get user by ID."""
@@ -70,9 +77,41 @@ class UserService:
         users = await self.repository.list_all()
         return [UserResponse(**user) for user in users]
 
+    async def list_users_page(
+        self, limit: int, after: str | None = None
+    ) -> tuple[list[UserResponse], str | None]:
+        """
+        One page of users ordered by user ID, after the ``after`` cursor.
+
+        Returns the page and the cursor for the next one (None on the last
+        page). The cursor is the last user ID on the page.
+        """
+        users = await self.repository.list_page(limit + 1, after)
+        page = [UserResponse(**user) for user in users[:limit]]
+        next_cursor = page[-1].user_id if len(users) > limit else None
+        return page, next_cursor
+
+    async def export_users(self, batch_size: int = 500) -> AsyncIterator[str]:
+        """
+        Every user as newline-delimited JSON, read page by page from the
+        repository so memory stays flat however many users there are.
+        Yields one chunk of lines per page.
+        """
+        after = None
+        while True:
+            users = await self.repository.list_page(batch_size, after)
+            if not users:
+                return
+            yield "".join(
+                UserResponse(**user).model_dump_json() + "\n" for user in users
+            )
+            if len(users) < batch_size:
+                return
+            after = users[-1]["user_id"]
+
 
 def get_user_service(
-    repository: Annotated[UserRepository, Depends(get_user_repository)],
+    repository: Annotated[UserRepositoryProtocol, Depends(get_user_repository)],
 ) -> UserService:
     """Dependency for user service."""
     return UserService(repository)
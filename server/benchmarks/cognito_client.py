@@ -0,0 +1,91 @@
+"""
+Benchmark sign-in latency with a per-request vs shared boto3 Cognito client.
+
+Runs the Cognito part of a social sign-in (``CognitoProvider.sign_in``)
+against a local cognito-idp stand-in. "per-request"
+builds a fresh client for every sign-in (the old ``get_cognito_provider``
+behaviour); "shared" reuses the process-wide, pool-tuned client.
+
+Run from the server directory:
+    python -m benchmarks.cognito_client --sign-ins 200 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import app.main  # noqa: F401  (load app modules in application import order)
+from app.core.config import Settings
+from app.providers.cognito import CognitoProvider, create_cognito_client
+from benchmarks.fakes import FakeCognito
+
+
+async def run(mode: str, settings: Settings, sign_ins: int, concurrency: int):
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    shared = create_cognito_client(settings) if mode == "shared" else None
+    if shared is not None:
+        await CognitoProvider(settings, executor, shared).warm_up()
+
+    latencies: list[float] = []
+    queue = iter(range(sign_ins))
+
+    async def worker() -> None:
+        for i in queue:
+            start = time.perf_counter()
+            provider = CognitoProvider(settings, executor, shared)
+            await provider.sign_in(f"user-{i % 50}@example.com")
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    executor.shutdown()
+
+    latencies.sort()
+    return {
+        "throughput": sign_ins / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sign-ins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    # boto3 signs requests, so it needs (any) credentials
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+
+    print(
+        f"{args.sign_ins} sign-ins, concurrency={args.concurrency}, "
+        f"stand-in latency={args.latency * 1000:.0f} ms"
+    )
+    print(f"{'client':<12} {'sign-in/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'conns':>6}")
+    for mode in ("per-request", "shared"):
+        fake = FakeCognito(latency=args.latency).start()
+        settings = Settings(
+            cognito_user_pool_id="us-east-1_bench",
+            cognito_client_id="bench",
+            cognito_endpoint_url=fake.endpoint_url,
+            cognito_max_pool_connections=args.concurrency,
+        )
+        try:
+            result = asyncio.run(run(mode, settings, args.sign_ins, args.concurrency))
+        finally:
+            fake.stop()
+        print(
+            f"{mode:<12} {result['throughput']:>10.0f} "
+            f"{result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f} "
+            f"{fake.connections:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
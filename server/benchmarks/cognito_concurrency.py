@@ -0,0 +1,91 @@
+"""
+Load test concurrent social sign-ins against a slow Cognito.
+
+Drives ``POST /auth/google`` through the ASGI app with a stand-in
+boto3 client that blocks for ``--latency`` seconds per call (like a real
+Cognito round trip), and Google token verification stubbed out. Runs the
+same sign-ins twice: with a single-worker executor, so Cognito calls
+serialize as they would on the event loop, and with ``--workers`` threads.
+
+Run from the server directory:
+    python -m benchmarks.cognito_concurrency --requests 64 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from app.core.config import get_settings
+from app.main import create_app
+from app.providers.cognito import CognitoProvider, get_cognito_provider
+from app.providers.google import get_google_provider
+from benchmarks.fakes import FakeCognitoIdp
+
+
+class StubGoogleProvider:
+    async def verify_token(self, id_token: str) -> dict:
+        return {"sub": id_token, "email": f"{id_token}@example.com"}
+
+
+async def run(requests: int, latency: float, workers: int) -> dict:
+    app = create_app()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cognito")
+    client = FakeCognitoIdp(latency=latency)
+
+    def cognito_provider() -> CognitoProvider:
+        return CognitoProvider(get_settings(), executor, client)
+
+    app.dependency_overrides[get_cognito_provider] = cognito_provider
+    app.dependency_overrides[get_google_provider] = StubGoogleProvider
+
+    latencies: list[float] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+
+        async def sign_in(i: int) -> None:
+            start = time.perf_counter()
+            response = await http.post("/auth/google", json={"id_token": f"user-{i}"})
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(sign_in(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    executor.shutdown()
+    latencies.sort()
+    return {
+        "elapsed": elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    print(
+        f"{args.requests} concurrent /auth/google sign-ins, "
+        f"{args.latency * 1000:.0f} ms per Cognito call"
+    )
+    for label, workers in (
+        ("serialized", 1),
+        (f"workers={args.workers}", args.workers),
+    ):
+        result = asyncio.run(run(args.requests, args.latency, workers))
+        print(
+            f"{label:<12} wall {result['elapsed']:6.2f} s, "
+            f"p50 {result['p50_ms']:.0f} ms, p99 {result['p99_ms']:.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark Cognito round trips per social sign-in.
+
+Compares the lookup-first path (``get_or_create_user`` + ``initiate_auth``)
+with the optimised ``CognitoProvider.sign_in`` path, with and without the
+known-user cache, against the local cognito-idp stand-in for a mix of new
+and returning users.
+
+Run from the server directory:
+    python -m benchmarks.cognito_sign_in --sign-ins 400 --users 100 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import app.main  # noqa: F401  (load app modules in application import order)
+from app.core.cache import TTLCache
+from app.core.config import Settings
+from app.providers.cognito import (
+    CognitoMetrics,
+    CognitoProvider,
+    create_cognito_client,
+)
+from benchmarks.fakes import FakeCognito
+
+
+async def lookup_first(provider: CognitoProvider, email: str) -> None:
+    username = await provider.get_or_create_user(email)
+    await provider.initiate_auth(username)
+
+
+async def optimised(provider: CognitoProvider, email: str) -> None:
+    await provider.sign_in(email)
+
+
+PATHS = (
+    ("lookup-first", lookup_first, False),
+    ("optimised", optimised, False),
+    ("optimised+cache", optimised, True),
+)
+
+
+async def run(
+    path,
+    cached: bool,
+    settings: Settings,
+    sign_ins: int,
+    users: int,
+    concurrency: int,
+):
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    client = create_cognito_client(settings)
+    metrics = CognitoMetrics()
+    known_users = TTLCache(max_entries=users) if cached else None
+
+    latencies: list[float] = []
+    queue = iter(range(sign_ins))
+
+    async def worker() -> None:
+        for i in queue:
+            start = time.perf_counter()
+            provider = CognitoProvider(settings, executor, client, metrics, known_users)
+            await path(provider, f"user-{i % users}@example.com")
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    executor.shutdown()
+
+    latencies.sort()
+    return {
+        "calls_per_sign_in": sum(metrics.calls.values()) / sign_ins,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sign-ins", type=int, default=400)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+
+    print(
+        f"{args.sign_ins} sign-ins over {args.users} users, "
+        f"concurrency={args.concurrency}, "
+        f"stand-in latency={args.latency * 1000:.0f} ms"
+    )
+    print(f"{'path':<16} {'calls/sign-in':>14} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, path, cached in PATHS:
+        fake = FakeCognito(latency=args.latency).start()
+        settings = Settings(
+            cognito_user_pool_id="us-east-1_bench",
+            cognito_client_id="bench",
+            cognito_endpoint_url=fake.endpoint_url,
+            cognito_max_pool_connections=args.concurrency,
+        )
+        try:
+            result = asyncio.run(
+                run(
+                    path,
+                    cached,
+                    settings,
+                    args.sign_ins,
+                    args.users,
+                    args.concurrency,
+                )
+            )
+        finally:
+            fake.stop()
+        print(
+            f"{name:<16} {result['calls_per_sign_in']:>14.2f} "
+            f"{result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""
+Local stand-ins for external services used by the benchmarks.
+
+- ``FakeCognitoIdp``: in-process cognito-idp backend with the boto3 client
+  interface ``CognitoProvider`` uses, with latency, error and throttle
+  injection.
+- ``FakeCognito``: the same backend served over the cognito-idp JSON
+  protocol on localhost, so a real boto3 client (pointed at it via
+  ``endpoint_url``) exercises signing, connection pooling and retries.
+- ``FakeIdentityProvider``: an Apple/Google-style issuer with its own RSA
+  key, a JWKS and a token minter; ``fake_jwks_client`` serves those JWKS to
+  ``JWKSService`` without network access.
+"""
+
+import json
+import random
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import httpx
+from botocore.exceptions import ClientError
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from app.core.ratelimit import TokenBucket
+from app.services.jwks_service import JWKSService
+
+TARGET_PREFIX = "AWSCognitoIdentityProviderService."
+
+
+class CognitoError(Exception):
+    """An error response in the cognito-idp wire format."""
+
+    def __init__(self, code: str, message: str = "", status: int = 400):
+        super().__init__(message or code)
+        self.code = code
+        self.message = message or code
+        self.status = status
+
+
+class FakeCognitoIdp:
+    """
+    In-memory cognito-idp backend with the boto3 client call interface.
+
+    Pass it to ``CognitoProvider`` as ``client``. Users move through the
+    real lifecycle: ``AdminCreateUser`` leaves them in FORCE_CHANGE_PASSWORD,
+    a permanent ``AdminSetUserPassword`` confirms them, and
+    ``AdminInitiateAuth`` checks the password.
+
+    Every call blocks for ``latency`` seconds (plus up to ``jitter``). With
+    ``error_rate`` it fails with ``InternalErrorException`` and with
+    ``throttle_rate`` it fails with ``TooManyRequestsException``. If
+    ``quotas`` gives requests/second per operation, calls over quota are
+    throttled too. ``calls`` counts requests per operation.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        quotas: dict[str, float] | None = None,
+        seed: int | None = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.buckets = {op: TokenBucket(rate) for op, rate in (quotas or {}).items()}
+        self.users: dict[str, dict] = {}
+        self.refresh_tokens: dict[str, str] = {}
+        self.calls: dict[str, int] = {}
+        self.throttled = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def handle(self, operation: str, params: dict) -> dict:
+        """Run one API call by wire name (``AdminGetUser``). Raises CognitoError."""
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+            roll = self._random.random()
+            delay = self.latency + self._random.random() * self.jitter
+            bucket = self.buckets.get(operation)
+            over_quota = bucket is not None and bucket.delay() > 0
+            if bucket is not None and not over_quota:
+                bucket.reserve()
+
+        if delay:
+            time.sleep(delay)
+
+        if over_quota or roll < self.throttle_rate:
+            with self._lock:
+                self.throttled += 1
+            raise CognitoError("TooManyRequestsException", "Too many requests")
+        if roll < self.throttle_rate + self.error_rate:
+            raise CognitoError("InternalErrorException", "Injected failure", 500)
+
+        handler = getattr(self, f"_op_{operation}", None)
+        if handler is None:
+            raise CognitoError("InvalidAction", f"Unsupported: {operation}")
+        with self._lock:
+            return handler(params)
+
+    def _client_call(self, operation: str, params: dict) -> dict:
+        """boto3-style call: errors surface as botocore ClientError."""
+        try:
+            return self.handle(operation, params)
+        except CognitoError as e:
+            raise ClientError(
+                {
+                    "Error": {"Code": e.code, "Message": e.message},
+                    "ResponseMetadata": {"HTTPStatusCode": e.status},
+                },
+                operation,
+            )
+
+    # boto3 client interface
+
+    def describe_user_pool(self, **params: Any) -> dict:
+        return self._client_call("DescribeUserPool", params)
+
+    def admin_get_user(self, **params: Any) -> dict:
+        return self._client_call("AdminGetUser", params)
+
+    def admin_create_user(self, **params: Any) -> dict:
+        return self._client_call("AdminCreateUser", params)
+
+    def admin_set_user_password(self, **params: Any) -> dict:
+        return self._client_call("AdminSetUserPassword", params)
+
+    def admin_initiate_auth(self, **params: Any) -> dict:
+        return self._client_call("AdminInitiateAuth", params)
+
+    # Operations (called with the lock held)
+
+    def _user(self, username: str) -> dict:
+        user = self.users.get(username)
+        if user is None:
+            raise CognitoError("UserNotFoundException", "User does not exist.")
+        return user
+
+    def _op_DescribeUserPool(self, params: dict) -> dict:
+        return {"UserPool": {"Id": params["UserPoolId"]}}
+
+    def _op_AdminGetUser(self, params: dict) -> dict:
+        user = self._user(params["Username"])
+        return {
+            "Username": params["Username"],
+            "UserAttributes": user["attributes"],
+            "UserStatus": user["status"],
+            "Enabled": True,
+        }
+
+    def _op_AdminCreateUser(self, params: dict) -> dict:
+        username = params["Username"]
+        if username in self.users:
+            raise CognitoError("UsernameExistsException", "User already exists")
+        self.users[username] = {
+            "attributes": params.get("UserAttributes", []),
+            "status": "FORCE_CHANGE_PASSWORD",
+            "password": None,
+        }
+        return {"User": {"Username": username, "UserStatus": "FORCE_CHANGE_PASSWORD"}}
+
+    def _op_AdminSetUserPassword(self, params: dict) -> dict:
+        user = self._user(params["Username"])
+        user["password"] = params["Password"]
+        if params.get("Permanent"):
+            user["status"] = "CONFIRMED"
+        return {}
+
+    def _op_AdminInitiateAuth(self, params: dict) -> dict:
+        auth = params["AuthParameters"]
+        if params["AuthFlow"] == "REFRESH_TOKEN_AUTH":
+            username = self.refresh_tokens.get(auth["REFRESH_TOKEN"])
+            if username is None or username not in self.users:
+                raise CognitoError("NotAuthorizedException", "Invalid Refresh Token")
+            # Cognito doesn't return a new refresh token for this flow
+            return {"AuthenticationResult": self._issue_tokens()}
+
+        user = self._user(auth["USERNAME"])
+        if user["password"] != auth["PASSWORD"]:
+            raise CognitoError("NotAuthorizedException", "Incorrect password.")
+        if user["status"] != "CONFIRMED":
+            return {"ChallengeName": "NEW_PASSWORD_REQUIRED", "Session": "session"}
+
+        refresh_token = secrets.token_urlsafe(32)
+        self.refresh_tokens[refresh_token] = auth["USERNAME"]
+        return {
+            "AuthenticationResult": {
+                **self._issue_tokens(),
+                "RefreshToken": refresh_token,
+            }
+        }
+
+    @staticmethod
+    def _issue_tokens() -> dict:
+        return {
+            "IdToken": secrets.token_urlsafe(32),
+            "AccessToken": secrets.token_urlsafe(32),
+            "ExpiresIn": 3600,
+            "TokenType": "Bearer",
+        }
+
+
+class FakeCognito:
+    """
+    ``FakeCognitoIdp`` behind a threaded local HTTP server.
+
+    ``connections`` counts TCP connections accepted, to show pooling.
+    """
+
+    def __init__(self, latency: float = 0.0, backend: FakeCognitoIdp | None = None):
+        self.backend = backend or FakeCognitoIdp(latency=latency)
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+
+    @property
+    def users(self) -> dict[str, dict]:
+        return self.backend.users
+
+    @property
+    def calls(self) -> dict[str, int]:
+        return self.backend.calls
+
+    @property
+    def endpoint_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeCognito":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real endpoint
+
+            def setup(self) -> None:
+                super().setup()
+                with fake._lock:
+                    fake.connections += 1
+
+            def do_POST(self) -> None:
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                operation = self.headers.get("X-Amz-Target", "").removeprefix(
+                    TARGET_PREFIX
+                )
+                try:
+                    status = 200
+                    payload = fake.backend.handle(operation, json.loads(body or b"{}"))
+                except CognitoError as e:
+                    status = e.status
+                    payload = {"__type": e.code, "message": e.message}
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/x-amz-json-1.1")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class FakeIdentityProvider:
+    """An Apple/Google-style token issuer with its own RSA signing key."""
+
+    def __init__(self, issuer: str, jwks_url: str, kid: str = "fake-key"):
+        self.issuer = issuer
+        self.jwks_url = jwks_url
+        self.kid = kid
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.private_pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ).decode()
+        public = jwk.construct(self.private_pem, "RS256").public_key().to_dict()
+        self.jwks = {"keys": [{**public, "kid": kid, "alg": "RS256", "use": "sig"}]}
+
+    @classmethod
+    def apple(cls) -> "FakeIdentityProvider":
+        return cls("https://appleid.apple.com", JWKSService.APPLE_JWKS_URL)
+
+    @classmethod
+    def google(cls) -> "FakeIdentityProvider":
+        return cls("https://accounts.google.com", JWKSService.GOOGLE_JWKS_URL)
+
+    def mint(
+        self,
+        sub: str,
+        audience: str,
+        email: str | None = None,
+        expires_in: int = 3600,
+        **claims: Any,
+    ) -> str:
+        """Sign an identity token for ``sub`` as this issuer would."""
+        now = int(time.time())
+        payload = {
+            "iss": self.issuer,
+            "aud": audience,
+            "sub": sub,
+            "iat": now,
+            "exp": now + expires_in,
+            **claims,
+        }
+        if email:
+            payload["email"] = email
+            payload["email_verified"] = True
+        return jwt.encode(
+            payload, self.private_pem, algorithm="RS256", headers={"kid": self.kid}
+        )
+
+
+def fake_jwks_client(*providers: FakeIdentityProvider) -> httpx.AsyncClient:
+    """An HTTP client serving each provider's JWKS at its URL, offline."""
+    jwks_by_url = {provider.jwks_url: provider.jwks for provider in providers}
+
+    def respond(request: httpx.Request) -> httpx.Response:
+        jwks = jwks_by_url.get(str(request.url))
+        if jwks is None:
+            return httpx.Response(404)
+        return httpx.Response(200, json=jwks)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(respond))
@@ -0,0 +1,71 @@
+"""
+Benchmark token refresh against a full social sign-in re-exchange.
+
+Signs in ``--users`` users once to obtain Cognito refresh tokens, then
+renews every session twice: by repeating the Google exchange (JWKS lookup,
+RS256 verification, Cognito sign-in) and via ``POST /auth/refresh`` (one
+Cognito call). Uses the offline fakes from ``benchmarks.sign_in``.
+
+Run from the server directory:
+    python -m benchmarks.refresh --users 200 --concurrency 16 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import logging
+
+from benchmarks.sign_in import SignInBench, drive
+
+
+async def run(args: argparse.Namespace) -> None:
+    bench = SignInBench(latency=args.latency, users=args.users, quotas=False)
+    sign_ins = [bench.sign_in_request(i, "google") for i in range(args.users)]
+
+    async with bench.client() as http:
+        first = await drive(http, sign_ins, args.concurrency)
+        refresh_tokens = [r.json()["refresh_token"] for r in first["responses"]]
+
+        results = {}
+        for name, requests in (
+            (
+                "re-exchange",
+                [bench.sign_in_request(i, "google") for i in range(args.users)],
+            ),
+            (
+                "refresh",
+                [("/auth/refresh", {"refresh_token": t}) for t in refresh_tokens],
+            ),
+        ):
+            calls_before = sum(bench.metrics.calls.values())
+            results[name] = await drive(http, requests, args.concurrency)
+            calls = sum(bench.metrics.calls.values()) - calls_before
+            results[name]["calls"] = calls / len(requests)
+    await bench.close()
+
+    print(
+        f"{args.users} sessions, concurrency={args.concurrency}, "
+        f"cognito latency={args.latency * 1000:.0f} ms (+jitter)"
+    )
+    print(
+        f"{'flow':<12} {'req/s':>7} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'cpu ms':>7} {'cognito calls':>14} statuses"
+    )
+    for name, result in results.items():
+        print(
+            f"{name:<12} {result['throughput']:>7.0f} {result['p50_ms']:>8.1f} "
+            f"{result['p99_ms']:>8.1f} {result['cpu_ms']:>7.2f} "
+            f"{result['calls']:>14.2f} {result['statuses']}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.02)
+    logging.disable(logging.ERROR)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
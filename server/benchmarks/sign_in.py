@@ -0,0 +1,219 @@
+"""
+Benchmark full Apple/Google sign-ins offline.
+
+Drives ``POST /auth/apple`` and ``POST /auth/google`` through the ASGI app
+with freshly minted identity tokens from fake issuers (real JWKS lookup and
+RS256 verification) and the in-process fake Cognito backend, so sign-in
+throughput and tail latency can be measured without network access.
+
+Run from the server directory:
+    python -m benchmarks.sign_in --requests 500 --concurrency 32 --latency 0.02
+    python -m benchmarks.sign_in --throttle-rate 0.05 --error-rate 0.01
+    python -m benchmarks.sign_in --no-quotas
+
+By default the client-side Cognito quotas apply (AdminSetUserPassword's 25
+requests/second caps sign-in throughput); ``--no-quotas`` lifts them.
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from collections import Counter
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.cache import TTLCache
+from app.core.config import Settings, get_settings
+from app.core.ratelimit import QuotaScheduler
+from app.main import create_app
+from app.providers.cognito import CognitoMetrics, CognitoProvider, get_cognito_provider
+from app.services.jwks_service import JWKSService, get_jwks_service
+from benchmarks.fakes import FakeCognitoIdp, FakeIdentityProvider, fake_jwks_client
+
+APPLE_BUNDLE_ID = "com.example.bench"
+GOOGLE_CLIENT_ID = "bench.apps.googleusercontent.com"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    return values[max(int(len(values) * pct) - 1, 0)]
+
+
+class SignInBench:
+    """The ASGI app wired to fake identity providers and a fake Cognito."""
+
+    def __init__(
+        self,
+        latency: float = 0.02,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        users: int = 100,
+        quotas: bool = True,
+    ):
+        self.settings = Settings(
+            cognito_user_pool_id="us-east-1_bench",
+            cognito_client_id="bench",
+            apple_bundle_id=APPLE_BUNDLE_ID,
+            google_client_id=GOOGLE_CLIENT_ID,
+        )
+        self.apple = FakeIdentityProvider.apple()
+        self.google = FakeIdentityProvider.google()
+        self.cognito = FakeCognitoIdp(
+            latency=latency,
+            jitter=latency,
+            error_rate=error_rate,
+            throttle_rate=throttle_rate,
+            seed=0,
+        )
+        self.jwks_service = JWKSService(
+            self.settings, client=fake_jwks_client(self.apple, self.google)
+        )
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.settings.cognito_max_workers
+        )
+        self.metrics = CognitoMetrics()
+        self.known_users = TTLCache(max_entries=users)
+        self.scheduler = QuotaScheduler(
+            self.settings.cognito_quotas if quotas else {},
+            self.settings.cognito_quota_max_wait,
+        )
+
+        self.app: FastAPI = create_app()
+        self.app.dependency_overrides[get_settings] = lambda: self.settings
+        self.app.dependency_overrides[get_jwks_service] = lambda: self.jwks_service
+        self.app.dependency_overrides[get_cognito_provider] = self.cognito_provider
+
+    def cognito_provider(self) -> CognitoProvider:
+        return CognitoProvider(
+            self.settings,
+            self.executor,
+            self.cognito,
+            self.metrics,
+            self.known_users,
+            self.scheduler,
+        )
+
+    def sign_in_request(self, user: int, provider: str) -> tuple[str, dict]:
+        """Path and body of a sign-in with a freshly minted identity token."""
+        email = f"user-{user}@example.com"
+        if provider == "apple":
+            token = self.apple.mint(f"apple-{user}", APPLE_BUNDLE_ID, email)
+            return "/auth/apple", {"identity_token": token, "authorization_code": "c"}
+        token = self.google.mint(f"google-{user}", GOOGLE_CLIENT_ID, email)
+        return "/auth/google", {"id_token": token}
+
+    def client(self) -> httpx.AsyncClient:
+        transport = httpx.ASGITransport(app=self.app)
+        return httpx.AsyncClient(transport=transport, base_url="http://bench")
+
+    async def close(self) -> None:
+        self.executor.shutdown()
+        await self.jwks_service.stop()
+
+
+async def drive(
+    http: httpx.AsyncClient,
+    requests: Iterable[tuple[str, dict]],
+    concurrency: int,
+) -> dict:
+    """POST every request with ``concurrency`` workers; return latency stats."""
+    latencies: list[float] = []
+    statuses: Counter[int] = Counter()
+    responses: list[httpx.Response] = []
+    queue = iter(requests)
+
+    async def worker() -> None:
+        for path, body in queue:
+            start = time.perf_counter()
+            response = await http.post(path, json=body)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+            responses.append(response)
+
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+
+    latencies.sort()
+    return {
+        "count": len(latencies),
+        "throughput": len(latencies) / elapsed,
+        "cpu_ms": cpu / len(latencies) * 1000,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "statuses": dict(sorted(statuses.items())),
+        "responses": responses,
+    }
+
+
+async def run(args: argparse.Namespace) -> None:
+    bench = SignInBench(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        users=args.users,
+        quotas=not args.no_quotas,
+    )
+
+    def provider_for(i: int) -> str:
+        if args.provider == "mixed":
+            return "apple" if i % 2 else "google"
+        return args.provider
+
+    requests = [
+        bench.sign_in_request(i % args.users, provider_for(i))
+        for i in range(args.requests)
+    ]
+    async with bench.client() as http:
+        result = await drive(http, requests, args.concurrency)
+    await bench.close()
+
+    calls = sum(bench.metrics.calls.values())
+    print(
+        f"{args.requests} {args.provider} sign-ins over {args.users} users, "
+        f"concurrency={args.concurrency}, cognito latency={args.latency * 1000:.0f} ms"
+        f" (+jitter), errors={args.error_rate:.0%}, throttles={args.throttle_rate:.0%}"
+    )
+    print(f"throughput:   {result['throughput']:.0f} sign-ins/s")
+    print(
+        f"latency ms:   p50 {result['p50_ms']:.1f}  "
+        f"p95 {result['p95_ms']:.1f}  p99 {result['p99_ms']:.1f}"
+    )
+    print(f"statuses:     {result['statuses']}")
+    print(
+        f"cognito:      {calls / args.requests:.2f} calls/sign-in, "
+        f"{bench.cognito.calls}"
+    )
+    for operation, stats in bench.scheduler.stats().items():
+        if stats["waited"] or stats["rejected"] or stats["throttled"]:
+            print(f"quota:        {operation} {stats}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--provider", choices=["apple", "google", "mixed"], default="mixed"
+    )
+    parser.add_argument(
+        "--no-quotas", action="store_true", help="disable client-side Cognito quotas"
+    )
+    # Keep injected failures from flooding the report
+    logging.disable(logging.ERROR)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
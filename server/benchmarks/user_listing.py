@@ -0,0 +1,80 @@
+"""
+Benchmark listing users: full list vs one keyset page vs NDJSON export.
+
+Fills a SQLite (or JSON) store with ``--users`` users, then measures time
+and peak Python memory (tracemalloc) of ``UserService.list_users`` (every
+user as ``UserResponse`` objects, as ``GET /users`` without parameters
+builds), of one ``list_users_page`` deep into the keyspace, and of
+consuming ``export_users`` (``GET /users?format=ndjson``) chunk by chunk.
+
+Run from the server directory:
+    python -m benchmarks.user_listing --users 100000
+    python -m benchmarks.user_listing --store json
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Awaitable
+from pathlib import Path
+
+from app.repositories.sqlite_user_repository import SQLiteUserRepository
+from app.repositories.user_repository import UserRepository
+from app.services.user_service import UserService
+from benchmarks.user_repository import fill, make_users
+
+
+async def measure(work: Awaitable[object]) -> tuple[float, float]:
+    """Seconds and peak traced MiB while awaiting ``work``."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    await work
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+async def run(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        repository = fill(args.store, Path(tmp), make_users(args.users))
+        if isinstance(repository, UserRepository):
+            await repository.load()
+        service = UserService(repository)
+
+        async def full_list() -> None:
+            await service.list_users()
+
+        async def one_page() -> None:
+            await service.list_users_page(args.page_size, f"user-{args.users // 2:08d}")
+
+        async def export() -> None:
+            async for _ in service.export_users():
+                pass
+
+        print(f"{args.users} users in {args.store}")
+        print(f"{'mode':<22} {'seconds':>8} {'peak MiB':>9}")
+        for name, work in (
+            ("list (GET /users)", full_list),
+            (f"page of {args.page_size}", one_page),
+            ("ndjson export", export),
+        ):
+            elapsed, peak = await measure(work())
+            print(f"{name:<22} {elapsed:>8.3f} {peak:>9.1f}")
+
+        if isinstance(repository, SQLiteUserRepository):
+            repository.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--store", choices=["json", "sqlite"], default="sqlite")
+    parser.add_argument("--page-size", type=int, default=100)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
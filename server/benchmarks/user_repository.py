@@ -0,0 +1,114 @@
+"""
+Benchmark the JSON and SQLite user repositories at growing user counts.
+
+For each size, fills a fresh store in a temporary directory and times
+``get_by_id``, ``get_by_email`` and ``get_or_create`` (existing and new
+users) per operation. The JSON store holds every user in memory as dicts,
+so it is skipped above ``--json-max`` users.
+
+Run from the server directory:
+    python -m benchmarks.user_repository
+    python -m benchmarks.user_repository --sizes 10000 100000 --ops 200
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from pathlib import Path
+
+from app.repositories.sqlite_user_repository import SQLiteUserRepository
+from app.repositories.user_repository import UserRepository, UserRepositoryProtocol
+
+
+def make_users(count: int) -> list[dict]:
+    created_at = datetime.now(UTC).isoformat()
+    return [
+        {
+            "user_id": f"user-{i:08d}",
+            "email": f"user-{i}@example.com",
+            "name": f"User {i}",
+            "created_at": created_at,
+        }
+        for i in range(count)
+    ]
+
+
+def fill(store: str, data_dir: Path, users: list[dict]) -> UserRepositoryProtocol:
+    if store == "json":
+        (data_dir / "users.json").write_text(json.dumps(users, indent=2))
+        return UserRepository(data_dir)
+    repository = SQLiteUserRepository(data_dir / "users.db")
+    repository.import_users(users)
+    return repository
+
+
+async def per_op_ms(ops: int, fn: Callable[[int], Awaitable[object]]) -> float:
+    start = time.perf_counter()
+    for i in range(ops):
+        await fn(i)
+    return (time.perf_counter() - start) / ops * 1000
+
+
+async def bench(store: str, size: int, ops: int) -> dict[str, float]:
+    rng = random.Random(0)
+    picks = [rng.randrange(size) for _ in range(ops)]
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        repository = fill(store, Path(tmp), make_users(size))
+        results = {"fill_s": time.perf_counter() - start}
+
+        results["get_by_id"] = await per_op_ms(
+            ops, lambda i: repository.get_by_id(f"user-{picks[i]:08d}")
+        )
+        results["get_by_email"] = await per_op_ms(
+            ops, lambda i: repository.get_by_email(f"user-{picks[i]}@example.com")
+        )
+        results["get_or_create_hit"] = await per_op_ms(
+            ops,
+            lambda i: repository.get_or_create({"user_id": f"user-{picks[i]:08d}"}),
+        )
+        results["get_or_create_new"] = await per_op_ms(
+            ops,
+            lambda i: repository.get_or_create(
+                {"user_id": f"new-{i}", "email": f"new-{i}@example.com"}
+            ),
+        )
+        if isinstance(repository, SQLiteUserRepository):
+            repository.close()
+    return results
+
+
+async def run(args: argparse.Namespace) -> None:
+    print(
+        f"{'store':<7} {'users':>9} {'fill s':>8} {'by_id ms':>9} "
+        f"{'by_email ms':>12} {'get_or_create ms (hit/new)':>27}"
+    )
+    for size in args.sizes:
+        for store in ("json", "sqlite"):
+            if store == "json" and size > args.json_max:
+                continue
+            r = await bench(store, size, args.ops)
+            print(
+                f"{store:<7} {size:>9} {r['fill_s']:>8.1f} {r['get_by_id']:>9.3f} "
+                f"{r['get_by_email']:>12.3f} "
+                f"{r['get_or_create_hit']:>13.3f} / {r['get_or_create_new']:<11.3f}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--ops", type=int, default=1000)
+    parser.add_argument("--json-max", type=int, default=100_000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
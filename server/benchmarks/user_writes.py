@@ -0,0 +1,92 @@
+"""
+Benchmark concurrent user creation in the JSON repository.
+
+Runs ``--creates`` first-time ``get_or_create`` calls from 1, 10 and 100
+concurrent creators, with group commit (``--batch-size``/``--batch-delay``)
+and without it (batches of one, no wait). Every batch is one log append and
+one fsync, so throughput under concurrency is bound by how many creates
+share each sync.
+
+Run from the server directory:
+    python -m benchmarks.user_writes
+    python -m benchmarks.user_writes --creates 5000 --concurrency 1 10 100 1000
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from app.repositories.user_repository import UserRepository
+from benchmarks.sign_in import percentile
+
+
+async def bench(
+    concurrency: int, creates: int, batch_size: int, batch_delay: float
+) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        repository = UserRepository(
+            Path(tmp), write_batch_size=batch_size, write_batch_delay=batch_delay
+        )
+        await repository.load()
+        latencies: list[float] = []
+        queue = iter(range(creates))
+
+        async def creator() -> None:
+            for i in queue:
+                start = time.perf_counter()
+                await repository.get_or_create(
+                    {"user_id": f"user-{i}", "email": f"user-{i}@example.com"}
+                )
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(creator() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        await repository.stop()
+
+        assert len(await repository.list_all()) == creates
+        latencies.sort()
+        return {
+            "throughput": creates / elapsed,
+            "p50_ms": statistics.median(latencies) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+            **repository.writer.stats(),
+        }
+
+
+async def run(args: argparse.Namespace) -> None:
+    print(
+        f"{args.creates} creates, group commit up to {args.batch_size} per batch "
+        f"(delay {args.batch_delay * 1000:.1f} ms)"
+    )
+    print(
+        f"{'creators':>8} {'mode':<13} {'creates/s':>10} {'p50 ms':>8} "
+        f"{'p99 ms':>8} {'writes':>7} {'avg batch':>10}"
+    )
+    for concurrency in args.concurrency:
+        for mode, batch_size, batch_delay in (
+            ("unbatched", 1, 0.0),
+            ("group commit", args.batch_size, args.batch_delay),
+        ):
+            r = await bench(concurrency, args.creates, batch_size, batch_delay)
+            print(
+                f"{concurrency:>8} {mode:<13} {r['throughput']:>10.0f} "
+                f"{r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['batches']:>7} "
+                f"{r['avg_batch_size']:>10.1f}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--creates", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--batch-delay", type=float, default=0.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark JWT signature verification backends.
+
+Compares the inline, thread-pool and process-pool backends from
+``app.core.signature`` on freshly minted RS256 tokens (the claims cache is
+bypassed, so every call pays a real signature check).
+
+Run from the server directory:
+    python -m benchmarks.verify_backends --tokens 5000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from app.core.signature import create_signature_verifier
+from app.core.tokens import ParsedToken
+
+
+def make_key_pair() -> tuple[str, object]:
+    """Generate an RSA key; return (private PEM, public verification key)."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public = jwk.construct(pem, "RS256").public_key().to_dict()
+    return pem, jwk.construct(public, "RS256")
+
+
+def mint_tokens(pem: str, count: int) -> list[ParsedToken]:
+    now = int(time.time())
+    return [
+        ParsedToken.parse(
+            jwt.encode(
+                {"sub": f"user-{i}", "iat": now, "exp": now + 3600},
+                pem,
+                algorithm="RS256",
+                headers={"kid": "bench"},
+            )
+        )
+        for i in range(count)
+    ]
+
+
+async def run_backend(backend: str, workers: int, key, tokens, concurrency: int):
+    verifier = create_signature_verifier(backend, workers, preload=[key])
+    try:
+        # Warm up pools (spawns workers, loads keys)
+        await asyncio.gather(*(verifier.verify(t, key) for t in tokens[: workers * 2]))
+
+        latencies: list[float] = []
+        queue = iter(tokens)
+
+        async def worker():
+            for token in queue:
+                start = time.perf_counter()
+                await verifier.verify(token, key)
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    finally:
+        verifier.close()
+
+    latencies.sort()
+    return {
+        "backend": backend,
+        "throughput": len(tokens) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--backends", nargs="+", default=["inline", "thread", "process"]
+    )
+    args = parser.parse_args()
+
+    pem, key = make_key_pair()
+    tokens = mint_tokens(pem, args.tokens)
+
+    print(
+        f"{args.tokens} tokens, concurrency={args.concurrency}, "
+        f"workers={args.workers}, cpus={os.cpu_count()}"
+    )
+    print(f"{'backend':<8} {'verify/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for backend in args.backends:
+        result = await run_backend(backend, args.workers, key, tokens, args.concurrency)
+        print(
+            f"{result['backend']:<8} {result['throughput']:>10.0f} "
+            f"{result['p50_ms']:>8.3f} {result['p99_ms']:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,55 @@
+"""
+Tests for the /auth routes.
+"""
+
+import pytest
+
+from app.providers.cognito import CognitoProvider, get_cognito_provider
+from benchmarks.fakes import FakeCognitoIdp
+
+EMAIL = "user@example.com"
+
+
+@pytest.fixture
+def idp(app, settings):
+    """Serve Cognito calls from the in-process fake."""
+    idp = FakeCognitoIdp()
+    app.dependency_overrides[get_cognito_provider] = lambda: CognitoProvider(
+        settings, client=idp
+    )
+    return idp
+
+
+def test_refresh_returns_new_tokens(client, idp):
+    idp.handle("AdminCreateUser", {"Username": EMAIL})
+    idp.refresh_tokens["refresh-1"] = EMAIL
+
+    response = client.post("/auth/refresh", json={"refresh_token": "refresh-1"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["access_token"]
+    assert body["id_token"]
+    # Cognito does not rotate it, so the caller's refresh token comes back
+    assert body["refresh_token"] == "refresh-1"
+    assert idp.calls == {"AdminCreateUser": 1, "AdminInitiateAuth": 1}
+
+
+def test_refresh_with_a_rejected_token_is_unauthorized(client, idp):
+    response = client.post("/auth/refresh", json={"refresh_token": "revoked"})
+
+    assert response.status_code == 401
+    assert idp.calls == {"AdminInitiateAuth": 1}
+
+
+@pytest.mark.parametrize("body", [{}, {"refresh_token": ""}])
+def test_refresh_requires_a_refresh_token(client, idp, body):
+    response = client.post("/auth/refresh", json=body)
+
+    assert response.status_code == 422
+    assert idp.calls == {}
+
+
+def test_introspect_requires_authentication(client):
+    response = client.post("/auth/introspect", json={"tokens": ["x"]})
+    assert response.status_code == 401
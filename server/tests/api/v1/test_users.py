@@ -0,0 +1,80 @@
+"""
+Tests for the /users routes.
+"""
+
+import json
+
+import pytest
+
+from app.core.security import verify_token
+from app.repositories.user_repository import UserRepository
+from app.services.user_service import UserService, get_user_service
+
+
+@pytest.fixture
+def users_file(app, tmp_path):
+    """Serve /users from a JSON repository under tmp_path, authenticated."""
+    repository = UserRepository(tmp_path)
+    app.dependency_overrides[get_user_service] = lambda: UserService(repository)
+    app.dependency_overrides[verify_token] = lambda: {"sub": "u1"}
+    return repository.users_file
+
+
+@pytest.fixture(autouse=True)
+def users(users_file):
+    users = [
+        {
+            "user_id": f"u{i}",
+            "email": f"u{i}@example.com",
+            "name": None,
+            "created_at": "2026-01-01T00:00:00+00:00",
+        }
+        for i in range(1, 6)
+    ]
+    users_file.write_text(json.dumps(users))
+    return users
+
+
+def test_pages_walk_every_user_once(client):
+    pages, after = [], None
+    while True:
+        params = {"limit": 2, **({"after": after} if after else {})}
+        response = client.get("/users", params=params)
+        assert response.status_code == 200
+        pages.append([user["user_id"] for user in response.json()])
+        after = response.headers.get("X-Next-Cursor")
+        if after is None:
+            break
+
+    assert pages == [["u1", "u2"], ["u3", "u4"], ["u5"]]
+
+
+def test_full_last_page_has_no_cursor(client, users):
+    response = client.get("/users", params={"limit": 5})
+
+    assert len(response.json()) == len(users)
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_page_after_the_last_user_is_empty(client):
+    response = client.get("/users", params={"limit": 2, "after": "u5"})
+
+    assert response.json() == []
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_ndjson_streams_every_user(client, users):
+    response = client.get("/users", params={"format": "ndjson"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert [json.loads(line) for line in lines] == users
+
+
+def test_without_paging_returns_every_user(client, users):
+    assert client.get("/users").json() == users
+
+
+def test_unknown_format_is_rejected(client):
+    assert client.get("/users", params={"format": "csv"}).status_code == 422
@@ -2,9 +2,15 @@
 Pytest configuration and fixtures.
 """
 
+from dataclasses import dataclass
+
 import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
 from fastapi.testclient import TestClient
+from jose import jwk, jwt
 
+from app.core.config import Settings
 from app.main import create_app
 
 
@@ -27,3 +33,52 @@ def mock_settings(monkeypatch):
     monkeypatch.setenv("COGNITO_CLIENT_ID", "test-client-id")
     monkeypatch.setenv("AWS_REGION", "us-east-1")
     monkeypatch.setenv("ENVIRONMENT", "test")
+
+
+@pytest.fixture
+def settings(tmp_path):
+    """Settings with every provider configured and data under tmp_path."""
+    return Settings(
+        cognito_user_pool_id="us-east-1_test",
+        cognito_client_id="test-client-id",
+        apple_bundle_id="com.example.test",
+        google_client_id="test.apps.googleusercontent.com",
+        data_dir=tmp_path,
+    )
+
+
+@dataclass
+class SigningKey:
+    """An RSA key pair for signing test tokens."""
+
+    kid: str
+    private_pem: str
+
+    @property
+    def jwk(self) -> dict:
+        public = jwk.construct(self.private_pem, "RS256").public_key().to_dict()
+        return {**public, "kid": self.kid, "alg": "RS256", "use": "sig"}
+
+    def sign(self, claims: dict, **headers) -> str:
+        return jwt.encode(
+            claims,
+            self.private_pem,
+            algorithm="RS256",
+            headers={"kid": self.kid, **headers},
+        )
+
+
+def _signing_key(kid: str) -> SigningKey:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    return SigningKey(kid, pem)
+
+
+@pytest.fixture(scope="session")
+def signing_keys() -> dict[str, SigningKey]:
+    """Two signing keys ("k1", "k2"), generated once per test session."""
+    return {kid: _signing_key(kid) for kid in ("k1", "k2")}
@@ -0,0 +1,115 @@
+"""
+Tests for GroupCommitter batching, error fan-out and shutdown.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.batching import GroupCommitClosedError, GroupCommitter
+
+
+class Store:
+    """Commit function that records batches, optionally blocking or failing."""
+
+    def __init__(self):
+        self.batches: list[list] = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.started = asyncio.Event()
+        self.error: Exception | None = None
+
+    async def commit(self, items: list) -> list:
+        self.batches.append(items)
+        self.started.set()
+        await self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        return [item * 10 for item in items]
+
+
+@pytest.fixture
+def store():
+    return Store()
+
+
+async def test_each_caller_gets_its_own_result(store):
+    committer = GroupCommitter(store.commit)
+    results = await asyncio.gather(*(committer.submit(i) for i in range(5)))
+    assert results == [0, 10, 20, 30, 40]
+    await committer.close()
+
+
+async def test_submissions_during_a_commit_form_the_next_batch(store):
+    committer = GroupCommitter(store.commit)
+    store.gate.clear()
+    first = asyncio.create_task(committer.submit(1))
+    await store.started.wait()
+
+    rest = [asyncio.create_task(committer.submit(i)) for i in (2, 3, 4)]
+    await asyncio.sleep(0)
+    store.gate.set()
+    await asyncio.gather(first, *rest)
+
+    assert store.batches == [[1], [2, 3, 4]]
+    assert committer.stats()["batches"] == 2
+    assert committer.stats()["avg_batch_size"] == 2
+    await committer.close()
+
+
+async def test_batches_are_capped_at_max_batch_size(store):
+    committer = GroupCommitter(store.commit, max_batch_size=2)
+    await asyncio.gather(*(committer.submit(i) for i in range(5)))
+    assert [len(batch) for batch in store.batches] == [2, 2, 1]
+    await committer.close()
+
+
+async def test_max_delay_lets_a_batch_fill(store):
+    committer = GroupCommitter(store.commit, max_batch_size=3, max_delay=5.0)
+    first = asyncio.create_task(committer.submit(1))
+    await asyncio.sleep(0)
+    # The third submission fills the batch, so the writer stops waiting
+    await asyncio.wait_for(
+        asyncio.gather(first, committer.submit(2), committer.submit(3)), timeout=1.0
+    )
+    assert store.batches == [[1, 2, 3]]
+    await committer.close()
+
+
+async def test_commit_error_reaches_the_whole_batch_only(store):
+    committer = GroupCommitter(store.commit)
+    store.error = OSError("disk full")
+    results = await asyncio.gather(
+        committer.submit(1), committer.submit(2), return_exceptions=True
+    )
+    assert all(isinstance(r, OSError) for r in results)
+
+    store.error = None
+    assert await committer.submit(3) == 30
+    await committer.close()
+
+
+async def test_wrong_result_count_fails_the_batch():
+    async def short_commit(items):
+        return items[:1]
+
+    committer = GroupCommitter(short_commit)
+    results = await asyncio.gather(
+        committer.submit(1), committer.submit(2), return_exceptions=True
+    )
+    assert results[0] == 1
+    assert isinstance(results[1], ValueError)
+    await committer.close()
+
+
+async def test_close_fails_in_flight_and_queued_callers(store):
+    committer = GroupCommitter(store.commit, max_batch_size=2)
+    store.gate.clear()
+    callers = [asyncio.create_task(committer.submit(i)) for i in range(5)]
+    await store.started.wait()
+
+    await committer.close()
+    results = await asyncio.wait_for(
+        asyncio.gather(*callers, return_exceptions=True), timeout=1.0
+    )
+    assert all(isinstance(r, GroupCommitClosedError) for r in results)
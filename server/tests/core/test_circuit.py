@@ -0,0 +1,114 @@
+"""
+Tests for the CircuitBreaker state machine.
+"""
+
+import pytest
+
+from app.core import circuit
+from app.core.circuit import CircuitBreaker, CircuitOpenError
+
+# Patch the clock before any breaker is built, so every timestamp is fake
+pytestmark = pytest.mark.usefixtures("clock")
+
+
+class Clock:
+    """Stands in for the ``time`` module with a manually advanced clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def breaker():
+    return CircuitBreaker(
+        "test",
+        window_size=4,
+        min_calls=4,
+        failure_rate=0.5,
+        slow_call_seconds=1.0,
+        open_seconds=30.0,
+        half_open_calls=2,
+    )
+
+
+def trip(cb: CircuitBreaker) -> None:
+    for failed in (False, False, True, True):
+        cb.allow()
+        cb.record(0.01, failed=failed)
+
+
+def test_stays_closed_below_min_calls(breaker):
+    for _ in range(3):
+        breaker.record(0.01, failed=True)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_stays_closed_below_failure_rate(breaker):
+    for failed in (False, False, False, True):
+        breaker.record(0.01, failed=failed)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_opens_at_failure_rate_and_rejects(breaker, clock):
+    trip(breaker)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now += 10
+    with pytest.raises(CircuitOpenError) as exc_info:
+        breaker.allow()
+    assert exc_info.value.retry_after == pytest.approx(20)
+    assert breaker.stats()["rejected"] == 1
+    assert breaker.stats()["times_opened"] == 1
+
+
+def test_slow_calls_count_as_failures(breaker):
+    for _ in range(4):
+        breaker.record(1.5)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_half_open_admits_limited_trials_then_closes(breaker, clock):
+    trip(breaker)
+    clock.now += 30
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    breaker.allow()
+    breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+    breaker.record(0.01)
+    breaker.record(0.01)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats()["window_calls"] == 0
+
+
+def test_half_open_failure_reopens(breaker, clock):
+    trip(breaker)
+    clock.now += 30
+    breaker.allow()
+    breaker.record(0.01, failed=True)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.times_opened == 2
+
+
+def test_unreported_trials_free_their_slots(breaker, clock):
+    trip(breaker)
+    clock.now += 30
+    breaker.allow()
+    breaker.allow()
+
+    # The trial calls were cancelled and never recorded an outcome
+    clock.now += 30
+    breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
@@ -0,0 +1,46 @@
+"""
+Tests for DeadlineMiddleware budget selection.
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.deadline import remaining
+from app.core.middleware import DeadlineMiddleware
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(
+        DeadlineMiddleware,
+        default_budget=10.0,
+        route_budgets={"/auth/apple": 8.0, "/auth/refresh": 0.0, "/auth": 9.0},
+    )
+
+    @app.api_route("/{path:path}", methods=["GET", "POST"])
+    async def budget() -> dict[str, float | None]:
+        return {"remaining": remaining()}
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    ("path", "expected"),
+    [
+        ("/auth/apple", 8.0),
+        ("/auth/apple/", 8.0),
+        ("/auth/apple/callback", 8.0),
+        ("/auth/applesauce", 9.0),
+        ("/auth/google", 9.0),
+        ("/users/me", 10.0),
+    ],
+)
+def test_budget_is_taken_from_the_longest_matching_prefix(client, path, expected):
+    left = client.post(path).json()["remaining"]
+    assert expected - 1 < left <= expected
+
+
+def test_zero_budget_means_no_deadline(client):
+    assert client.post("/auth/refresh").json()["remaining"] is None
@@ -0,0 +1,121 @@
+"""
+Tests for TokenBucket, QuotaScheduler and backoff jitter.
+"""
+
+import pytest
+
+from app.core import ratelimit
+from app.core.ratelimit import (
+    QuotaExceededError,
+    QuotaScheduler,
+    TokenBucket,
+    decorrelated_jitter,
+)
+
+pytestmark = pytest.mark.usefixtures("clock")
+
+
+class Clock:
+    """Stands in for the ``time`` module with a manually advanced clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ratelimit, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record scheduler sleeps instead of waiting them out."""
+    delays: list[float] = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(ratelimit.asyncio, "sleep", sleep)
+    return delays
+
+
+class TestTokenBucket:
+    def test_burst_then_queued_reservations(self):
+        bucket = TokenBucket(rate=10, burst=2)
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        # Each further caller queues one token interval behind the previous
+        assert bucket.reserve() == pytest.approx(0.1)
+        assert bucket.reserve() == pytest.approx(0.2)
+
+    def test_refills_over_time_up_to_capacity(self, clock):
+        bucket = TokenBucket(rate=10, burst=2)
+        bucket.reserve()
+        bucket.reserve()
+        clock.now += 0.1
+        assert bucket.delay() == 0
+        clock.now += 60
+        bucket.delay()
+        assert bucket.tokens == 2
+
+    def test_default_burst_is_one_second_of_rate(self):
+        assert TokenBucket(rate=5).capacity == 5
+        assert TokenBucket(rate=0.5).capacity == 1
+
+
+class TestQuotaScheduler:
+    async def test_waits_for_its_turn(self, sleeps):
+        scheduler = QuotaScheduler({"op": 10}, max_wait=1.0)
+        for _ in range(12):
+            await scheduler.acquire("op")
+
+        assert sleeps == pytest.approx([0.1, 0.2])
+        stats = scheduler.stats()["op"]
+        assert stats["waited"] == 2
+        assert stats["max_wait_ms"] == pytest.approx(200)
+        assert stats["queue_depth"] == 0
+
+    async def test_rejects_beyond_max_wait(self, sleeps):
+        scheduler = QuotaScheduler({"op": 1}, max_wait=0.5)
+        await scheduler.acquire("op")
+        with pytest.raises(QuotaExceededError) as exc_info:
+            await scheduler.acquire("op")
+        assert exc_info.value.wait == pytest.approx(1.0)
+        assert scheduler.stats()["op"]["rejected"] == 1
+        assert sleeps == []
+
+    async def test_per_call_max_wait_only_lowers_the_limit(self):
+        scheduler = QuotaScheduler({"op": 10}, max_wait=0.05)
+        for _ in range(10):
+            await scheduler.acquire("op")
+        with pytest.raises(QuotaExceededError):
+            await scheduler.acquire("op", max_wait=5.0)
+        with pytest.raises(QuotaExceededError):
+            await scheduler.acquire("op", max_wait=0.01)
+
+    async def test_unconfigured_operations_are_unlimited(self, sleeps):
+        scheduler = QuotaScheduler({"op": 0}, max_wait=0.0)
+        for _ in range(100):
+            await scheduler.acquire("op")
+            await scheduler.acquire("other")
+        assert sleeps == []
+        assert scheduler.stats() == {}
+
+    def test_record_throttle(self):
+        scheduler = QuotaScheduler({"op": 1}, max_wait=0.0)
+        scheduler.record_throttle("op")
+        scheduler.record_throttle("other")
+        assert scheduler.stats()["op"]["throttled"] == 1
+        assert scheduler.stats()["other"]["throttled"] == 1
+
+
+def test_decorrelated_jitter_stays_within_bounds():
+    delay = 0.05
+    for _ in range(200):
+        delay = decorrelated_jitter(delay, base=0.05, cap=1.0)
+        assert 0.05 <= delay <= 1.0
@@ -0,0 +1,234 @@
+"""
+Tests for JWTVerifier.
+"""
+
+import base64
+import json
+import time
+
+import pytest
+from jose import jwk
+
+from app.core import cache, tokens
+from app.core.cache import TTLCache
+from app.core.security import InvalidTokenError, JWTVerifier, TokenPrefilter
+from app.core.signature import SignatureVerifier
+from app.services.jwks_service import JWKSService
+
+
+class FakeJWKSService:
+    """Serves the test signing keys and counts lookups per (issuer, kid)."""
+
+    def __init__(self, signing_keys):
+        self.signing_keys = signing_keys
+        self.lookups: list[tuple[str, str]] = []
+
+    async def get_key(self, issuer, kid):
+        self.lookups.append((issuer, kid))
+        signing_key = self.signing_keys.get(kid)
+        if signing_key is None:
+            return None
+        return jwk.construct(signing_key.jwk, "RS256")
+
+
+@pytest.fixture
+def jwks_service(signing_keys):
+    return FakeJWKSService(signing_keys)
+
+
+@pytest.fixture
+def verifier(settings, jwks_service):
+    return JWTVerifier(settings, jwks_service)
+
+
+@pytest.fixture
+def sign(settings, signing_keys):
+    """Sign a Cognito token with the given key, overriding claims as needed."""
+
+    def sign(kid="k1", **overrides):
+        claims = {
+            "sub": "user-1",
+            "iss": settings.cognito_issuer,
+            "aud": settings.cognito_client_id,
+            "exp": int(time.time()) + 300,
+            **overrides,
+        }
+        return signing_keys[kid].sign(claims)
+
+    return sign
+
+
+def unsigned(header: dict, claims: dict) -> str:
+    """A token with the given header and claims and a junk signature."""
+
+    def b64(data: dict) -> str:
+        raw = json.dumps(data).encode()
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+    return f"{b64(header)}.{b64(claims)}.c2ln"
+
+
+class Clock:
+    """Stands in for the ``time`` module with a manually advanced clock."""
+
+    def __init__(self):
+        self.now = time.time()
+
+    def time(self) -> float:
+        return self.now
+
+
+class TestClaimsCache:
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        clock = Clock()
+        monkeypatch.setattr(cache, "time", clock)
+        monkeypatch.setattr(tokens, "time", clock)
+        return clock
+
+    @pytest.fixture
+    def verifier(self, settings, jwks_service):
+        return JWTVerifier(settings, jwks_service, claims_cache=TTLCache(100))
+
+    async def test_hit_until_the_token_expires(
+        self, verifier, jwks_service, sign, clock
+    ):
+        token = sign(exp=int(clock.now) + 60)
+        claims = await verifier.verify(token)
+
+        clock.now += 59
+        assert await verifier.verify(token) == claims
+        assert len(jwks_service.lookups) == 1
+        assert verifier.claims_cache.hits == 1
+
+        # Past exp the entry is gone, and full verification rejects the token
+        clock.now += 2
+        with pytest.raises(InvalidTokenError) as exc_info:
+            await verifier.verify(token)
+        assert exc_info.value.reason == "expired"
+        assert len(jwks_service.lookups) == 2
+
+    async def test_rejected_tokens_are_not_cached(self, verifier, sign):
+        token = sign(aud="another-client")
+        for _ in range(2):
+            with pytest.raises(InvalidTokenError):
+                await verifier.verify(token)
+        assert len(verifier.claims_cache) == 0
+
+
+class TestPrefilter:
+    @pytest.fixture
+    def prefilter(self, settings):
+        return TokenPrefilter(
+            max_length=4096,
+            issuers=frozenset((settings.cognito_issuer, JWTVerifier.GOOGLE_ISSUER)),
+        )
+
+    @pytest.fixture
+    def verifier(self, settings, jwks_service, prefilter):
+        return JWTVerifier(settings, jwks_service, prefilter=prefilter)
+
+    @pytest.fixture
+    def header(self):
+        return {"alg": "RS256", "kid": "k1", "typ": "JWT"}
+
+    @pytest.fixture
+    def payload(self, settings):
+        return {"iss": settings.cognito_issuer, "exp": int(time.time()) + 300}
+
+    @pytest.mark.parametrize(
+        ("token", "reason"),
+        [
+            ("a" * 5000, "oversized"),
+            ("not-a-token", "malformed"),
+            ("a.b", "malformed"),
+            ("e30.@@@.c2ln", "malformed"),
+        ],
+    )
+    async def test_rejects_junk_by_shape(
+        self, verifier, jwks_service, prefilter, token, reason
+    ):
+        with pytest.raises(InvalidTokenError) as exc_info:
+            await verifier.verify(token)
+        assert exc_info.value.reason == reason
+        assert prefilter.stats() == {reason: 1}
+        assert jwks_service.lookups == []
+
+    @pytest.mark.parametrize(
+        ("header_overrides", "claim_overrides", "reason"),
+        [
+            ({"alg": "HS256"}, {}, "disallowed_alg"),
+            ({"alg": "none"}, {}, "disallowed_alg"),
+            ({"kid": None}, {}, "missing_kid"),
+            ({}, {"iss": "https://evil.example.com"}, "unknown_issuer"),
+            ({}, {"exp": int(time.time()) - 60}, "expired"),
+            ({}, {"nbf": int(time.time()) + 600}, "not_yet_valid"),
+            ({}, {"exp": "soon"}, "malformed"),
+        ],
+    )
+    async def test_rejects_by_header_and_claims(
+        self,
+        verifier,
+        jwks_service,
+        prefilter,
+        header,
+        payload,
+        header_overrides,
+        claim_overrides,
+        reason,
+    ):
+        token = unsigned({**header, **header_overrides}, {**payload, **claim_overrides})
+        with pytest.raises(InvalidTokenError) as exc_info:
+            await verifier.verify(token)
+        assert exc_info.value.reason == reason
+        assert prefilter.stats() == {reason: 1}
+        assert jwks_service.lookups == []
+
+    async def test_passes_well_formed_tokens(self, verifier, prefilter, sign):
+        assert (await verifier.verify(sign(sub="a")))["sub"] == "a"
+        assert prefilter.stats() == {}
+
+
+class TestVerifyMany:
+    async def test_mixed_batch_keeps_per_token_results(self, verifier, sign):
+        tokens = [
+            sign(sub="a"),
+            sign(exp=int(time.time()) - 600),
+            "not-a-token",
+            sign(kid="k2", sub="b"),
+        ]
+        results = await verifier.verify_many(tokens)
+
+        assert results[0]["sub"] == "a"
+        assert isinstance(results[1], InvalidTokenError)
+        assert results[1].reason == "expired"
+        assert isinstance(results[2], InvalidTokenError)
+        assert results[2].reason == "malformed"
+        assert results[3]["sub"] == "b"
+
+    async def test_looks_up_each_key_once_per_batch(self, verifier, jwks_service, sign):
+        tokens = [sign(sub="a"), sign(kid="k2"), sign(sub="b"), sign(kid="k2")]
+        results = await verifier.verify_many(tokens)
+
+        assert all(isinstance(result, dict) for result in results)
+        assert sorted(jwks_service.lookups) == [
+            (JWKSService.COGNITO, "k1"),
+            (JWKSService.COGNITO, "k2"),
+        ]
+
+    async def test_backend_error_fails_only_its_token(
+        self, settings, jwks_service, sign
+    ):
+        class FlakyVerifier(SignatureVerifier):
+            async def verify(self, token, key, algorithms=("RS256",)):
+                if token.claims["sub"] == "bad":
+                    raise RuntimeError("worker died")
+                await super().verify(token, key, algorithms)
+
+        verifier = JWTVerifier(
+            settings, jwks_service, signature_verifier=FlakyVerifier()
+        )
+        results = await verifier.verify_many([sign(sub="bad"), sign(sub="good")])
+
+        assert isinstance(results[0], RuntimeError)
+        assert results[1]["sub"] == "good"
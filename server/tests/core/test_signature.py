@@ -0,0 +1,54 @@
+"""
+Tests for the signature verification backends.
+"""
+
+import time
+
+import pytest
+from jose import JWTError, jwk
+
+from app.core.signature import create_signature_verifier
+from app.core.tokens import ParsedToken
+
+
+@pytest.fixture(scope="module", params=["inline", "thread", "process"])
+def backend(request, signing_keys):
+    verifier = create_signature_verifier(
+        request.param,
+        workers=1,
+        preload=[jwk.construct(signing_keys["k1"].jwk, "RS256")],
+    )
+    yield verifier
+    verifier.close()
+
+
+@pytest.fixture
+def key(signing_keys):
+    return jwk.construct(signing_keys["k1"].jwk, "RS256")
+
+
+def token(signing_key) -> ParsedToken:
+    return ParsedToken.parse(
+        signing_key.sign({"sub": "user-1", "exp": int(time.time()) + 300})
+    )
+
+
+async def test_accepts_a_valid_signature(backend, key, signing_keys):
+    await backend.verify(token(signing_keys["k1"]), key)
+
+
+async def test_rejects_a_signature_from_another_key(backend, key, signing_keys):
+    # Signed with k2 but checked against k1, as with a forged kid header
+    forged = token(signing_keys["k2"])
+    with pytest.raises(JWTError):
+        await backend.verify(forged, key)
+
+
+async def test_rejects_a_disallowed_algorithm(backend, key, signing_keys):
+    with pytest.raises(JWTError):
+        await backend.verify(token(signing_keys["k1"]), key, algorithms=["ES256"])
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown JWT verification backend"):
+        create_signature_verifier("gpu")
@@ -0,0 +1,77 @@
+"""
+Tests for SingleFlight request coalescing.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+class Work:
+    """Counts runs and holds each one until released."""
+
+    def __init__(self, result="done", error: Exception | None = None):
+        self.result = result
+        self.error = error
+        self.runs = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.runs += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+async def test_concurrent_callers_share_one_run():
+    flight, work = SingleFlight(), Work()
+    callers = [asyncio.create_task(flight.do("k", work)) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert flight.in_flight("k")
+
+    work.release.set()
+    assert await asyncio.gather(*callers) == ["done"] * 5
+    assert work.runs == 1
+    assert not flight.in_flight("k")
+
+
+async def test_different_keys_run_separately():
+    flight, work = SingleFlight(), Work()
+    work.release.set()
+    await asyncio.gather(flight.do("a", work), flight.do("b", work))
+    assert work.runs == 2
+
+
+async def test_exception_reaches_every_caller():
+    flight, work = SingleFlight(), Work(error=ValueError("boom"))
+    callers = [asyncio.create_task(flight.do("k", work)) for _ in range(3)]
+    await asyncio.sleep(0)
+    work.release.set()
+
+    results = await asyncio.gather(*callers, return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+    assert work.runs == 1
+
+
+async def test_next_call_after_completion_starts_fresh():
+    flight, work = SingleFlight(), Work()
+    work.release.set()
+    await flight.do("k", work)
+    await flight.do("k", work)
+    assert work.runs == 2
+
+
+async def test_cancelled_waiter_does_not_cancel_shared_work():
+    flight, work = SingleFlight(), Work()
+    first = asyncio.create_task(flight.do("k", work))
+    second = asyncio.create_task(flight.do("k", work))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    work.release.set()
+    assert await second == "done"
@@ -0,0 +1,175 @@
+"""
+Tests for ParsedToken parsing, signature verification and claim validation.
+"""
+
+import base64
+import json
+import time
+
+import pytest
+from jose import jwk
+from jose.exceptions import ExpiredSignatureError, JWTClaimsError, JWTError
+
+from app.core.config import Settings
+from app.core.tokens import ParsedToken, validate_audience
+
+ISSUER = "https://issuer.example.com"
+AUDIENCE = "client-a"
+
+
+def b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def claims(**overrides) -> dict:
+    now = int(time.time())
+    return {
+        "iss": ISSUER,
+        "aud": AUDIENCE,
+        "sub": "user-1",
+        "iat": now,
+        "exp": now + 600,
+        **overrides,
+    }
+
+
+@pytest.fixture
+def key(signing_keys):
+    return signing_keys["k1"]
+
+
+@pytest.fixture
+def verification_key(key):
+    return jwk.construct(key.jwk, "RS256")
+
+
+class TestParse:
+    def test_round_trip(self, key):
+        token = ParsedToken.parse(key.sign(claims()))
+        assert token.kid == "k1"
+        assert token.alg == "RS256"
+        assert token.issuer == ISSUER
+        assert token.claims["sub"] == "user-1"
+
+    @pytest.mark.parametrize("raw", ["", "abc", "abc.def"])
+    def test_missing_segments(self, raw):
+        with pytest.raises(JWTError, match="Not enough segments"):
+            ParsedToken.parse(raw)
+
+    def test_bad_header_base64(self):
+        with pytest.raises(JWTError, match="headers"):
+            ParsedToken.parse("!!!." + b64(b"{}") + ".sig")
+
+    def test_header_not_an_object(self):
+        with pytest.raises(JWTError, match="must be a json object"):
+            ParsedToken.parse(b64(b"[1]") + "." + b64(b"{}") + ".sig")
+
+    def test_bad_payload_json(self):
+        with pytest.raises(JWTError, match="Invalid payload"):
+            ParsedToken.parse(b64(b'{"alg":"RS256"}') + "." + b64(b"{nope") + ".")
+
+    def test_payload_not_an_object(self):
+        with pytest.raises(JWTError, match="must be a json object"):
+            ParsedToken.parse(b64(b'{"alg":"RS256"}') + "." + b64(b'"x"') + ".")
+
+
+class TestVerifySignature:
+    def test_valid(self, key, verification_key):
+        ParsedToken.parse(key.sign(claims())).verify_signature(
+            verification_key, ["RS256"]
+        )
+
+    def test_alg_not_allowed(self, key, verification_key):
+        token = ParsedToken.parse(key.sign(claims()))
+        with pytest.raises(JWTError, match="alg value is not allowed"):
+            token.verify_signature(verification_key, ["ES256"])
+
+    def test_header_alg_none_rejected(self, key, verification_key):
+        _, payload, signature = key.sign(claims()).split(".")
+        forged = b64(json.dumps({"alg": "none", "kid": "k1"}).encode())
+        token = ParsedToken.parse(f"{forged}.{payload}.{signature}")
+        with pytest.raises(JWTError, match="alg value is not allowed"):
+            token.verify_signature(verification_key, ["RS256"])
+
+    def test_tampered_payload(self, key, verification_key):
+        header, _, signature = key.sign(claims()).split(".")
+        payload = b64(json.dumps(claims(sub="someone-else")).encode())
+        token = ParsedToken.parse(f"{header}.{payload}.{signature}")
+        with pytest.raises(JWTError, match="Signature verification failed"):
+            token.verify_signature(verification_key, ["RS256"])
+
+    def test_other_key(self, signing_keys, verification_key):
+        token = ParsedToken.parse(signing_keys["k2"].sign(claims()))
+        with pytest.raises(JWTError, match="Signature verification failed"):
+            token.verify_signature(verification_key, ["RS256"])
+
+
+class TestValidateClaims:
+    def validate(self, key, leeway=0, **overrides) -> dict:
+        return ParsedToken.parse(key.sign(claims(**overrides))).validate_claims(
+            issuers=[ISSUER], audiences=frozenset({AUDIENCE}), leeway=leeway
+        )
+
+    def test_valid(self, key):
+        assert self.validate(key)["sub"] == "user-1"
+
+    def test_expired(self, key):
+        with pytest.raises(ExpiredSignatureError):
+            self.validate(key, exp=int(time.time()) - 30)
+
+    def test_expired_within_leeway(self, key):
+        assert self.validate(key, leeway=60, exp=int(time.time()) - 30)
+
+    def test_not_yet_valid(self, key):
+        with pytest.raises(JWTClaimsError, match="not yet valid"):
+            self.validate(key, nbf=int(time.time()) + 30)
+
+    def test_not_yet_valid_within_leeway(self, key):
+        assert self.validate(key, leeway=60, nbf=int(time.time()) + 30)
+
+    def test_non_numeric_exp(self, key):
+        with pytest.raises(JWTClaimsError, match="must be an integer"):
+            self.validate(key, exp="soon")
+
+    def test_wrong_issuer(self, key):
+        with pytest.raises(JWTClaimsError, match="Invalid issuer"):
+            self.validate(key, iss="https://evil.example.com")
+
+    def test_wrong_audience(self, key):
+        with pytest.raises(JWTClaimsError, match="Invalid audience"):
+            self.validate(key, aud="client-b")
+
+    def test_audience_list(self, key):
+        assert self.validate(key, aud=["client-b", AUDIENCE])
+
+    def test_non_string_subject(self, key):
+        with pytest.raises(JWTClaimsError, match="Subject must be a string"):
+            self.validate(key, sub=42)
+
+
+class TestValidateAudience:
+    allowed = frozenset({"client-a", "client-b"})
+
+    @pytest.mark.parametrize("aud", ["client-a", ["client-b"], ["other", "client-a"]])
+    def test_string_or_list_match(self, aud):
+        validate_audience({"aud": aud}, self.allowed)
+
+    @pytest.mark.parametrize("aud", ["other", ["other"], []])
+    def test_no_match(self, aud):
+        with pytest.raises(JWTClaimsError, match="Invalid audience"):
+            validate_audience({"aud": aud}, self.allowed)
+
+    @pytest.mark.parametrize("aud", [42, ["client-a", 42], {"client-a": 1}])
+    def test_invalid_format(self, aud):
+        with pytest.raises(JWTClaimsError, match="Invalid claim format"):
+            validate_audience({"aud": aud}, self.allowed)
+
+    def test_absent_aud_passes(self):
+        validate_audience({}, self.allowed)
+
+    def test_accepts_the_configured_client_id_list(self):
+        client_ids = Settings(google_client_id="client-a, client-b").google_client_ids
+        assert client_ids == ["client-a", "client-b"]
+        validate_audience({"aud": "client-b"}, client_ids)
+        with pytest.raises(JWTClaimsError, match="Invalid audience"):
+            validate_audience({"aud": "other"}, client_ids)
@@ -0,0 +1,229 @@
+"""
+Tests for CognitoProvider against the in-process cognito-idp fake.
+"""
+
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import circuit
+from app.core.cache import TTLCache
+from app.core.circuit import CircuitBreaker
+from app.core.exceptions import DeadlineExceededError, ExternalServiceError
+from app.core.middleware import deadline_var
+from app.core.ratelimit import QuotaScheduler
+from app.providers import cognito
+from app.providers.cognito import CognitoProvider
+from benchmarks.fakes import FakeCognitoIdp
+
+EMAIL = "user@example.com"
+
+
+@pytest.fixture
+def idp():
+    return FakeCognitoIdp()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record retry backoff sleeps instead of waiting them out."""
+    delays: list[float] = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(cognito.asyncio, "sleep", sleep)
+    return delays
+
+
+@pytest.fixture
+def provider(settings, idp):
+    return CognitoProvider(settings, client=idp, known_users=TTLCache(max_entries=100))
+
+
+class TestSignIn:
+    async def test_new_user_takes_three_calls(self, provider, idp):
+        tokens = await provider.sign_in(EMAIL, "User")
+
+        assert tokens.access_token
+        assert idp.users[EMAIL]["status"] == "CONFIRMED"
+        assert provider.call_count == 3
+        assert provider.metrics.stats()["sign_ins"]["new_user"]["avg_calls"] == 3
+
+    async def test_known_user_takes_two_calls(self, provider, idp):
+        await provider.sign_in(EMAIL)
+        idp.calls.clear()
+
+        await provider.sign_in(EMAIL)
+
+        assert sum(idp.calls.values()) == 2
+        assert "AdminCreateUser" not in idp.calls
+        assert provider.metrics.stats()["sign_ins"]["known_user"]["avg_calls"] == 2
+
+    async def test_returning_user_is_found_by_the_create_call(
+        self, settings, provider, idp
+    ):
+        await provider.sign_in(EMAIL)
+        # A fresh process: the user exists but is not in the known-user cache
+        restarted = CognitoProvider(settings, client=idp)
+
+        await restarted.sign_in(EMAIL)
+
+        assert restarted.call_count == 3
+        assert restarted.metrics.stats()["sign_ins"]["returning_user"]["count"] == 1
+
+    async def test_user_created_concurrently_is_signed_in(self, provider, idp):
+        create = idp.admin_create_user
+
+        def create_after_another_instance(**params):
+            # Another instance's sign-in creates the same user first
+            idp.handle("AdminCreateUser", params)
+            return create(**params)
+
+        idp.admin_create_user = create_after_another_instance
+
+        tokens = await provider.sign_in(EMAIL)
+
+        assert tokens.access_token
+        assert provider.call_count == 3
+        assert provider.metrics.stats()["sign_ins"]["returning_user"]["count"] == 1
+
+    async def test_missing_email_is_rejected_without_calls(self, provider, idp):
+        with pytest.raises(HTTPException) as exc_info:
+            await provider.sign_in(None)
+        assert exc_info.value.status_code == 400
+        assert idp.calls == {}
+
+
+class TestKnownUsers:
+    async def test_deleted_known_user_is_recreated(self, provider, idp):
+        await provider.sign_in(EMAIL)
+        del idp.users[EMAIL]
+        idp.calls.clear()
+
+        tokens = await provider.sign_in(EMAIL)
+
+        assert tokens.access_token
+        assert EMAIL in idp.users
+        # The known-user attempt fails on its first call, then the create path
+        assert idp.calls == {
+            "AdminSetUserPassword": 2,
+            "AdminCreateUser": 1,
+            "AdminInitiateAuth": 1,
+        }
+        assert provider.known_users.get(EMAIL)
+
+    async def test_user_not_found_drops_the_cache_entry(self, provider, idp):
+        await provider.sign_in(EMAIL)
+        del idp.users[EMAIL]
+
+        with pytest.raises(HTTPException):
+            await provider.initiate_auth(EMAIL)
+
+        assert provider.known_users.get(EMAIL) is None
+
+
+class TestThrottling:
+    async def test_throttled_calls_are_retried_a_bounded_number_of_times(
+        self, settings, provider, idp, sleeps
+    ):
+        idp.throttle_rate = 1.0
+
+        with pytest.raises(ExternalServiceError):
+            await provider.get_user(EMAIL)
+
+        assert idp.calls["AdminGetUser"] == settings.cognito_throttle_retries + 1
+        assert len(sleeps) == settings.cognito_throttle_retries
+        assert all(
+            settings.cognito_retry_base_delay
+            <= delay
+            <= settings.cognito_retry_max_delay
+            for delay in sleeps
+        )
+
+    async def test_retry_backoff_is_bounded_by_the_remaining_deadline(
+        self, settings, provider, idp, sleeps
+    ):
+        idp.throttle_rate = 1.0
+        # Less time left than the shortest backoff: give up instead of sleeping
+        token = deadline_var.set(
+            time.monotonic() + settings.cognito_retry_base_delay / 2
+        )
+        try:
+            with pytest.raises(DeadlineExceededError):
+                await provider.get_user(EMAIL)
+        finally:
+            deadline_var.reset(token)
+
+        assert idp.calls["AdminGetUser"] == 1
+        assert sleeps == []
+
+
+class TestDeadlines:
+    async def test_slow_call_gives_up_at_the_request_deadline(self, settings):
+        provider = CognitoProvider(settings, client=FakeCognitoIdp(latency=0.5))
+        token = deadline_var.set(time.monotonic() + 0.05)
+        try:
+            start = time.monotonic()
+            with pytest.raises(DeadlineExceededError):
+                await provider.get_user(EMAIL)
+            assert time.monotonic() - start < 0.4
+        finally:
+            deadline_var.reset(token)
+
+    async def test_spent_deadline_skips_the_call(self, provider, idp):
+        token = deadline_var.set(time.monotonic() - 1)
+        try:
+            with pytest.raises(DeadlineExceededError):
+                await provider.get_user(EMAIL)
+        finally:
+            deadline_var.reset(token)
+        assert idp.calls == {}
+
+
+class Clock:
+    """Stands in for the ``time`` module with a manually advanced clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class TestCircuitBreaker:
+    async def test_quota_rejection_keeps_the_half_open_trial_slot(
+        self, monkeypatch, settings, idp
+    ):
+        clock = Clock()
+        monkeypatch.setattr(circuit, "time", clock)
+        breaker = CircuitBreaker(
+            "cognito",
+            window_size=2,
+            min_calls=2,
+            failure_rate=0.5,
+            slow_call_seconds=1.0,
+            open_seconds=30.0,
+            half_open_calls=1,
+        )
+        for _ in range(2):
+            breaker.record(0.01, failed=True)
+        clock.now += 30
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+
+        scheduler = QuotaScheduler({"admin_get_user": 1}, max_wait=0.0)
+        await scheduler.acquire("admin_get_user")
+        provider = CognitoProvider(
+            settings, client=idp, scheduler=scheduler, breaker=breaker
+        )
+        for _ in range(3):
+            with pytest.raises(ExternalServiceError):
+                await provider.get_user(EMAIL)
+        assert idp.calls == {}
+        assert scheduler.stats()["admin_get_user"]["rejected"] == 3
+
+        # The rejected calls never took the single trial slot
+        provider.scheduler = None
+        assert await provider.get_user(EMAIL) is None
+        assert idp.calls == {"AdminGetUser": 1}
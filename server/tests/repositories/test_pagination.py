@@ -0,0 +1,57 @@
+"""
+Tests for keyset pagination (``list_page``) in both user repositories.
+"""
+
+import pytest
+
+from app.repositories.sqlite_user_repository import SQLiteUserRepository
+from app.repositories.user_repository import UserRepository
+
+
+@pytest.fixture
+def sqlite_repository(tmp_path):
+    repository = SQLiteUserRepository(tmp_path / "users.db")
+    yield repository
+    repository.close()
+
+
+@pytest.fixture
+async def json_repository(tmp_path):
+    repository = UserRepository(tmp_path)
+    yield repository
+    await repository.stop()
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def repository(request):
+    return request.getfixturevalue(f"{request.param}_repository")
+
+
+async def test_list_page_walks_users_in_id_order(repository):
+    for user_id in ("u3", "u1", "u5", "u2", "u4"):
+        await repository.create({"user_id": user_id})
+
+    pages, after = [], None
+    while page := await repository.list_page(2, after):
+        pages.append([user["user_id"] for user in page])
+        after = page[-1]["user_id"]
+    assert pages == [["u1", "u2"], ["u3", "u4"], ["u5"]]
+
+
+async def test_list_page_cursor_need_not_exist(repository):
+    for user_id in ("a", "c", "e"):
+        await repository.create({"user_id": user_id})
+
+    page = await repository.list_page(10, after="b")
+    assert [user["user_id"] for user in page] == ["c", "e"]
+    assert await repository.list_page(10, after="z") == []
+
+
+async def test_list_page_sees_users_created_between_pages(repository):
+    await repository.create({"user_id": "u1"})
+    await repository.create({"user_id": "u3"})
+    first = await repository.list_page(1)
+
+    await repository.create({"user_id": "u2"})
+    page = await repository.list_page(10, after=first[-1]["user_id"])
+    assert [user["user_id"] for user in page] == ["u2", "u3"]
@@ -0,0 +1,61 @@
+"""
+Tests for the SQLite user repository.
+"""
+
+import asyncio
+
+import pytest
+
+from app.repositories.sqlite_user_repository import SQLiteUserRepository
+
+
+@pytest.fixture
+def sqlite_repository(tmp_path):
+    repository = SQLiteUserRepository(tmp_path / "users.db")
+    yield repository
+    repository.close()
+
+
+async def test_create_and_lookup(sqlite_repository):
+    user = await sqlite_repository.create(
+        {"user_id": "u1", "email": "a@example.com", "name": "A"}
+    )
+    assert user["created_at"]
+    assert await sqlite_repository.get_by_id("u1") == user
+    assert await sqlite_repository.get_by_email("a@example.com") == user
+    assert await sqlite_repository.get_by_id("missing") is None
+    assert await sqlite_repository.get_by_email("missing@example.com") is None
+
+
+async def test_get_or_create_is_atomic(sqlite_repository):
+    results = await asyncio.gather(
+        *(
+            sqlite_repository.get_or_create({"user_id": "u1", "name": str(i)})
+            for i in range(8)
+        )
+    )
+    assert sum(created for _, created in results) == 1
+    assert len({user["name"] for user, _ in results}) == 1
+    assert len(await sqlite_repository.list_all()) == 1
+
+
+async def test_import_users_skips_existing_ids(sqlite_repository):
+    await sqlite_repository.create({"user_id": "u1", "email": "a@example.com"})
+    inserted = sqlite_repository.import_users(
+        [
+            {"user_id": "u1", "email": "other@example.com"},
+            {"user_id": "u2", "email": "b@example.com", "created_at": "2024-01-01"},
+        ]
+    )
+    assert inserted == 1
+    assert (await sqlite_repository.get_by_id("u1"))["email"] == "a@example.com"
+    assert (await sqlite_repository.get_by_id("u2"))["created_at"] == "2024-01-01"
+
+
+async def test_data_survives_reopening(sqlite_repository, tmp_path):
+    await sqlite_repository.create({"user_id": "u1"})
+    sqlite_repository.close()
+
+    reopened = SQLiteUserRepository(tmp_path / "users.db")
+    assert await reopened.get_by_id("u1") is not None
+    reopened.close()
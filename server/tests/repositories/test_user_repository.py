@@ -0,0 +1,150 @@
+"""
+Tests for the JSON user repository's append log, replay and compaction.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from app.repositories.user_repository import UserRepository
+
+
+@pytest.fixture
+async def repository(tmp_path):
+    repository = UserRepository(tmp_path)
+    yield repository
+    await repository.stop()
+
+
+def read_log(repository: UserRepository) -> list[dict]:
+    return [json.loads(line) for line in repository.log_file.read_text().splitlines()]
+
+
+def read_snapshot(repository: UserRepository) -> list[dict]:
+    return json.loads(repository.users_file.read_text())
+
+
+async def test_creates_append_to_the_log(repository):
+    await repository.create({"user_id": "u1", "email": "a@example.com"})
+    await repository.create({"user_id": "u2", "email": "b@example.com"})
+
+    assert [user["user_id"] for user in read_log(repository)] == ["u1", "u2"]
+    assert not repository.users_file.exists()
+    assert (await repository.get_by_email("b@example.com"))["user_id"] == "u2"
+
+
+async def test_replays_snapshot_and_log_on_startup(repository, tmp_path):
+    repository.users_file.write_text(
+        json.dumps([{"user_id": "u1", "email": "old@example.com"}])
+    )
+    await repository.create({"user_id": "u2", "email": "b@example.com"})
+    await repository.create({"user_id": "u1", "email": "new@example.com"})
+
+    reopened = UserRepository(tmp_path)
+    await reopened.load()
+    # A log record replaces the snapshot's record for the same user
+    assert (await reopened.get_by_id("u1"))["email"] == "new@example.com"
+    assert await reopened.get_by_id("u2") is not None
+    assert len(await reopened.list_all()) == 2
+
+
+async def test_replay_skips_a_torn_final_line(repository, tmp_path):
+    await repository.create({"user_id": "u1"})
+    with repository.log_file.open("a") as f:
+        f.write('{"user_id": "u2", "ema')
+
+    reopened = UserRepository(tmp_path)
+    assert [u["user_id"] for u in await reopened.list_all()] == ["u1"]
+
+    # The next append starts on a fresh line instead of extending the torn one
+    await reopened.create({"user_id": "u3"})
+    again = UserRepository(tmp_path)
+    assert {u["user_id"] for u in await again.list_all()} == {"u1", "u3"}
+    await reopened.stop()
+
+
+async def test_get_or_create_creates_once(repository):
+    results = await asyncio.gather(
+        *(repository.get_or_create({"user_id": "u1", "name": str(i)}) for i in range(5))
+    )
+    assert sum(created for _, created in results) == 1
+    assert all(user == results[0][0] for user, _ in results)
+    assert len(read_log(repository)) == 1
+
+
+async def test_compact_folds_the_log_into_the_snapshot(repository, tmp_path):
+    for i in range(3):
+        await repository.create({"user_id": f"u{i}"})
+
+    assert await repository.compact() is True
+    assert [u["user_id"] for u in read_snapshot(repository)] == ["u0", "u1", "u2"]
+    assert repository.log_file.read_text() == ""
+    assert await repository.compact() is False
+
+    await repository.create({"user_id": "u3"})
+    reopened = UserRepository(tmp_path)
+    assert len(await reopened.list_all()) == 4
+
+
+async def test_compact_keeps_records_appended_meanwhile(repository, tmp_path):
+    await repository.create({"user_id": "u1"})
+    save = repository._save
+
+    async def save_then_create(users):
+        await save(users)
+        # A create lands after the snapshot is written, before the log trim
+        await repository.create({"user_id": "u2"})
+
+    repository._save = save_then_create
+    assert await repository.compact() is True
+
+    assert [u["user_id"] for u in read_log(repository)] == ["u2"]
+    reopened = UserRepository(tmp_path)
+    assert {u["user_id"] for u in await reopened.list_all()} == {"u1", "u2"}
+
+
+async def test_email_index_follows_a_rewritten_record(repository, tmp_path):
+    await repository.create({"user_id": "u1", "email": "old@example.com"})
+    await repository.create({"user_id": "u1", "email": "new@example.com"})
+
+    assert await repository.get_by_email("old@example.com") is None
+    assert (await repository.get_by_email("new@example.com"))["user_id"] == "u1"
+
+    reopened = UserRepository(tmp_path)
+    assert await reopened.get_by_email("old@example.com") is None
+    assert (await reopened.get_by_email("new@example.com"))["user_id"] == "u1"
+
+
+async def test_email_lookup_returns_the_first_user_with_it(repository):
+    await repository.create({"user_id": "u1", "email": "shared@example.com"})
+    await repository.create({"user_id": "u2", "email": "shared@example.com"})
+    assert (await repository.get_by_email("shared@example.com"))["user_id"] == "u1"
+
+    # Once u1 moves to another email, u2 is the first match
+    await repository.create({"user_id": "u1", "email": "other@example.com"})
+    assert (await repository.get_by_email("shared@example.com"))["user_id"] == "u2"
+
+
+async def test_users_without_an_email_are_not_indexed_by_it(repository):
+    await repository.create({"user_id": "u1"})
+    await repository.create({"user_id": "u2", "email": ""})
+
+    assert await repository.get_by_email("") is None
+    assert await repository.get_by_email(None) is None
+
+
+async def test_create_for_an_existing_id_replaces_its_record(repository, tmp_path):
+    await repository.create({"user_id": "u1", "name": "Old"})
+    await repository.create({"user_id": "u2"})
+    await repository.create({"user_id": "u1", "name": "New"})
+
+    users = await repository.list_all()
+    assert [(u["user_id"], u.get("name")) for u in users] == [
+        ("u1", "New"),
+        ("u2", None),
+    ]
+    assert [u["user_id"] for u in await repository.list_page(10)] == ["u1", "u2"]
+
+    reopened = UserRepository(tmp_path)
+    assert await reopened.list_all() == users
@@ -0,0 +1,50 @@
+"""
+Tests for AuthService sign-in coalescing.
+"""
+
+import asyncio
+
+from app.services.auth_service import AuthService
+
+
+class SlowCognito:
+    """Records sign-ins and holds each one until released."""
+
+    def __init__(self):
+        self.calls: list[tuple[str | None, str | None]] = []
+        self.release = asyncio.Event()
+
+    async def sign_in(self, email, name=None):
+        self.calls.append((email, name))
+        await self.release.wait()
+        return f"tokens-for-{email}"
+
+
+def make_service(cognito) -> AuthService:
+    return AuthService(cognito, apple=None, google=None)
+
+
+async def test_concurrent_sign_ins_share_one_call_across_email_case():
+    cognito = SlowCognito()
+    service = make_service(cognito)
+
+    sign_ins = [
+        asyncio.create_task(service._sign_in(email, None))
+        for email in ("Jane@Example.com", " jane@example.com", "JANE@EXAMPLE.COM")
+    ]
+    await asyncio.sleep(0)
+    cognito.release.set()
+
+    assert await asyncio.gather(*sign_ins) == ["tokens-for-Jane@Example.com"] * 3
+    assert cognito.calls == [("Jane@Example.com", None)]
+
+
+async def test_different_emails_sign_in_separately():
+    cognito = SlowCognito()
+    cognito.release.set()
+    service = make_service(cognito)
+
+    await asyncio.gather(
+        service._sign_in("a@example.com", "A"), service._sign_in("b@example.com", "B")
+    )
+    assert sorted(cognito.calls) == [("a@example.com", "A"), ("b@example.com", "B")]
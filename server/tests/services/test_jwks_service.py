@@ -0,0 +1,146 @@
+"""
+Tests for JWKSService key lookup and refresh.
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from app.core.exceptions import DeadlineExceededError
+from app.core.middleware import deadline_var
+from app.services.jwks_service import JWKSService
+
+
+class JWKSEndpoint:
+    """Serves a mutable JWKS for every issuer and counts fetches."""
+
+    def __init__(self, *keys):
+        self.keys = list(keys)
+        self.fetches = 0
+        self.timeouts: list[dict] = []
+        self.delay = 0.0
+
+    def client(self) -> httpx.AsyncClient:
+        async def respond(request: httpx.Request) -> httpx.Response:
+            self.fetches += 1
+            self.timeouts.append(request.extensions["timeout"])
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            return httpx.Response(200, json={"keys": [k.jwk for k in self.keys]})
+
+        return httpx.AsyncClient(transport=httpx.MockTransport(respond))
+
+
+@pytest.fixture
+def endpoint(signing_keys):
+    return JWKSEndpoint(signing_keys["k1"])
+
+
+@pytest.fixture
+async def service(settings, endpoint):
+    service = JWKSService(settings, client=endpoint.client())
+    yield service
+    await service.stop()
+
+
+async def test_known_kid_is_served_from_one_fetch(service, endpoint):
+    assert await service.get_key("apple", "k1") is not None
+    assert await service.get_key("apple", "k1") is not None
+    assert endpoint.fetches == 1
+
+
+async def test_unknown_kid_refetches_once_then_is_cached(service, endpoint, settings):
+    settings.jwks_min_refresh_interval = 0
+    assert await service.get_key("apple", "forged") is None
+    assert await service.get_key("apple", "forged") is None
+    # One initial load and one refetch for the miss; the second miss is cached
+    assert endpoint.fetches == 2
+
+
+async def test_rate_limited_miss_does_not_block_rotated_key(
+    service, endpoint, settings, signing_keys
+):
+    await service.refresh("apple")
+    assert endpoint.fetches == 1
+
+    # Within the minimum refresh interval: no refetch, and nothing cached
+    assert await service.get_key("apple", "k2") is None
+    assert endpoint.fetches == 1
+    assert service.unknown_kids.get(("apple", "k2")) is None
+
+    # k2 is rotated in; once refetching is allowed again it is found
+    endpoint.keys.append(signing_keys["k2"])
+    settings.jwks_min_refresh_interval = 0
+    assert await service.get_key("apple", "k2") is not None
+    assert endpoint.fetches == 2
+
+
+async def test_fetch_timeout_is_bounded_by_request_budget(service, endpoint):
+    token = deadline_var.set(time.monotonic() + 2)
+    try:
+        await service.refresh("apple")
+    finally:
+        deadline_var.reset(token)
+    assert 0 < endpoint.timeouts[-1]["read"] <= 2
+
+    await service.refresh("google")
+    assert endpoint.timeouts[-1]["read"] == JWKSService.TIMEOUT
+
+
+async def test_slow_fetch_gives_up_at_the_request_deadline(service, endpoint):
+    endpoint.delay = 1.0
+    token = deadline_var.set(time.monotonic() + 0.05)
+    try:
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceededError):
+            await service.get_key("apple", "k1")
+        assert time.monotonic() - start < 0.5
+    finally:
+        deadline_var.reset(token)
+
+
+async def test_spent_deadline_skips_the_fetch(service, endpoint):
+    token = deadline_var.set(time.monotonic() - 1)
+    try:
+        with pytest.raises(DeadlineExceededError):
+            await service.get_key("apple", "k1")
+    finally:
+        deadline_var.reset(token)
+    assert endpoint.fetches == 0
+
+
+def write_snapshot(service: JWKSService, issuer: str, age: float, *keys) -> None:
+    service.snapshot_dir.mkdir(parents=True, exist_ok=True)
+    service._snapshot_path(issuer).write_text(
+        json.dumps(
+            {"fetched_at": time.time() - age, "jwks": {"keys": [k.jwk for k in keys]}}
+        )
+    )
+
+
+async def test_fresh_snapshot_is_served_without_a_fetch(
+    service, endpoint, signing_keys
+):
+    write_snapshot(service, "apple", 60, signing_keys["k1"])
+    await service.load_snapshots()
+
+    assert service.key_sets["apple"].from_snapshot
+    assert await service.get_key("apple", "k1") is not None
+    assert endpoint.fetches == 0
+
+
+async def test_expired_snapshot_is_ignored_at_startup(
+    service, endpoint, settings, signing_keys
+):
+    # The stale snapshot still holds a key the live JWKS has rotated out
+    write_snapshot(
+        service, "apple", settings.jwks_snapshot_max_age + 60, signing_keys["k2"]
+    )
+    await service.load_snapshots()
+
+    assert not service.key_sets["apple"].loaded
+    assert await service.get_key("apple", "k2") is None
+    assert endpoint.fetches >= 1